@@ -18,6 +18,7 @@ parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFo
 
 # Arguments for sensors and vehicle
 parser.add_argument("--sensors",  type=lambda p: Path(p).absolute(), default=cur_file_path() / "sensorsets" / "test_setup.yaml", dest="sensor_setup", help="Path to the yaml file defining the sensors.")
+parser.add_argument("--zones",  type=lambda p: Path(p).absolute(), default=None, help="Path to the yaml file defining additional zones, that are evaluated like the areas.")
 parser.add_argument("--vehicle",  type=lambda p: Path(p).absolute(), default=cur_file_path() / "vehicle" / "simple_box.obj", dest="vehicle_path", help="Path to the 3D vehicle model.")
 
 # Arguments for Directories
@@ -32,6 +33,18 @@ parser.add_argument("--no_plots", action="store_true", help="Deactivate creation
 parser.add_argument("--gui_mode", action='store_true', help="Activate GUI mode for entering settings.",)
 parser.add_argument("--create_report", action="store_true", help="Create a pdf report with results.",)
 parser.add_argument("--save_variables", action="store_true", help="Save variables as pickle.")
+parser.add_argument("--blind_profile", action="store_true", help="Save the blind area and blind distances of every z-level of the grid as table and plot.")
+parser.add_argument("--distance_field", action="store_true", help="Save the 3D distance of every cell to the nearest covered cell and its statistics.")
+parser.add_argument("--blind_regions", action="store_true", help="Save the volume, bounding box and distance to the vehicle of every connected blind region.")
+parser.add_argument("--azimuth_profile", action="store_true", help="Save the blind range around the vehicle for azimuth bins and height bands as table and polar plot.")
+parser.add_argument("--birds_eye_view", action="store_true", help="Save bird's-eye-view rasters of the coverage for the height bands as pgm images.")
+parser.add_argument("--ground_plane", action="store_true", help="Evaluate the coverage on a dense 2D lattice of the ground plane and save its metrics and rasters.")
+parser.add_argument("--exact_sections", action="store_true", help="Compute the blind area and blind distances of horizontal cross-sections exactly, independent of the grid spacing.")
+parser.add_argument("--placement", type=lambda p: Path(p).absolute(), default=None, help="Path to the yaml file defining the candidates of a greedy sensor placement, see placement/example_candidates.yaml.")
+parser.add_argument("--min_subset", type=lambda p: Path(p).absolute(), default=None, help="Path to the yaml file defining coverage targets. The smallest (cheapest) subset of the sensorset meeting the targets is selected, see targets/example_targets.yaml.")
+parser.add_argument("--tolerance", type=lambda p: Path(p).absolute(), default=None, help="Path to the yaml file defining the mounting tolerances of the sensors. The metrics are evaluated for random samples of the sensorset and their mean, spread and worst case are saved, see tolerances/example_tolerances.yaml.")
+parser.add_argument("--outputs", nargs="+", default=None, help="Only evaluate the listed outputs without report and plots, e.g. total:total_coverage blind_spot_volume z=0.8:blind_area.")
+parser.add_argument("--load_variables", type=lambda p: Path(p).absolute(), default=None, help="Path to the pickle of a previous simulation. The coverage is not recalculated, only the conditions are evaluated again.")
 
 # --------------------------------------------------
 program_args = parser.parse_args()
@@ -0,0 +1,79 @@
+import numpy as np
+
+from . import grid_helpers as helpers
+
+
+# this class computes the blind range around the vehicle for azimuth bins and height bands, which generalizes the
+# blind distances of the slices to 360 degrees. the calc_points are binned by their cylindrical coordinates around the
+# center of the vehicle and every value is a grouped reduction over the bins. bins is the number of azimuth bins,
+# bands are the borders of the height bands. a value that is not defined for a bin is nan: the vehicle_radius and the
+# blind_range of a bin without cells of the vehicle (e.g. a band above the roof), the first_covered_radius and the
+# blind_range of a bin without a covered cell, where the blind range is not bounded by the grid
+class AzimuthProfile:
+    def __init__(self, grid, bins=72, bands=(0, 0.3, 1.8, 6)):
+        self.grid = grid
+        self.bins = bins
+        self.bands = np.asarray(bands, dtype=float)
+        self.angles = np.linspace(-180, 180, bins + 1)
+        self.vehicle_radius = None
+        self.first_covered_radius = None
+        self.blind_range = None
+
+        # call function to set the metrics
+        self.__set_metrics()
+
+    # private function that sets the metrics of all bins. every metric has the shape (bands, bins)
+    def __set_metrics(self):
+        bounds = self.grid.car.bounds
+        center = np.array([(bounds[0] + bounds[1]) / 2, (bounds[2] + bounds[3]) / 2, 0])
+        n_groups = (self.bands.size - 1) * self.bins
+
+        # covered and blind calc_points and the cells of the vehicle with their bin and band
+        data = self.grid.mesh.cell_data["sensorset"]
+        outside_indices = self.grid.outside_indices.ravel()
+        covered = data[outside_indices, 1] > 0
+        car_indices = np.intersect1d(self.grid.car_points_indices, self.grid.remove_indices)
+        calc_points = helpers.calculate_cyl_from_cart(self.grid.calc_points - center)
+        car_points = helpers.calculate_cyl_from_cart(self.grid.points[car_indices] - center)
+        calc_groups = self.__get_groups(calc_points)
+        car_groups = self.__get_groups(car_points)
+
+        # radius of the vehicle in every bin, only the calc_points beyond the vehicle are examined (all calc_points of a
+        # bin without cells of the vehicle)
+        vehicle_radius = np.full(n_groups, -np.inf)
+        valid = car_groups >= 0
+        np.maximum.at(vehicle_radius, car_groups[valid], car_points[valid, 0])
+        vehicle_radius[np.isinf(vehicle_radius)] = np.nan
+        valid = calc_groups >= 0
+        valid[valid] &= np.invert(calc_points[valid, 0] < vehicle_radius[calc_groups[valid]])
+
+        # radius of the first covered cell beyond the vehicle in every bin
+        first_covered_radius = np.full(n_groups, np.inf)
+        np.minimum.at(first_covered_radius, calc_groups[valid & covered], calc_points[valid & covered, 0])
+        first_covered_radius[np.isinf(first_covered_radius)] = np.nan
+
+        # the blind range is the distance of the farthest blind cell before the first covered cell to the vehicle. it
+        # is nan if the bin has no radius of the vehicle or no covered cell
+        blind_radius = np.zeros(n_groups)
+        blind = valid & np.invert(covered)
+        blind[blind] &= calc_points[blind, 0] < first_covered_radius[calc_groups[blind]]
+        np.maximum.at(blind_radius, calc_groups[blind], calc_points[blind, 0])
+        blind_range = np.where(blind_radius > 0, blind_radius - vehicle_radius, 0)
+        blind_range[np.isnan(vehicle_radius) | np.isnan(first_covered_radius)] = np.nan
+
+        shape = (self.bands.size - 1, self.bins)
+        self.vehicle_radius = self.__round(vehicle_radius).reshape(shape)
+        self.first_covered_radius = self.__round(first_covered_radius).reshape(shape)
+        self.blind_range = self.__round(blind_range).reshape(shape)
+
+    # private function that returns the group (band * bins + azimuth bin) of points in cylindrical coordinates, -1 for
+    # points outside of the bands
+    def __get_groups(self, cyl_points):
+        azimuth_bins = np.clip(np.searchsorted(self.angles, cyl_points[:, 1], side="right") - 1, 0, self.bins - 1)
+        bands = np.searchsorted(self.bands, cyl_points[:, 2], side="right") - 1
+        valid = (bands >= 0) & (bands < self.bands.size - 1)
+        return np.where(valid, bands * self.bins + azimuth_bins, -1)
+
+    # private function that rounds values to two decimals like the python round function
+    def __round(self, values):
+        return np.array([round(value, 2) for value in values.tolist()])
@@ -0,0 +1,58 @@
+import numpy as np
+
+from . import grid_helpers as helpers
+
+# value of the raster cells without calc_points in the band
+NO_DATA = 255
+
+
+# this class computes bird's-eye-view rasters of the grid by reducing the structured cell data over height bands. for
+# every band [z_min, z_max] and every column (x, y) of cells the products are computed with one reduction along z:
+# covered (any cell covered), min_sensors and max_sensors (min/max number of sensors) and covered_cells (number of
+# covered cells). the rasters have the shape (bands, ny, nx) and the type uint8, NO_DATA marks columns without
+# calc_points in the band (vehicle or not evaluated)
+class BirdsEyeView:
+    def __init__(self, grid, bands=((0.3, 1.8), (0, 6))):
+        self.grid = grid
+        self.bands = np.asarray(bands, dtype=float).reshape(-1, 2)
+        self.products = {}
+        # georeferencing of the rasters: lower left corner of the cell (0, 0) and the size of a cell
+        self.origin = (grid.mesh.origin[0], grid.mesh.origin[1])
+        self.resolution = grid.mesh.spacing[0]
+
+        # call function to set the rasters
+        self.__set_products()
+
+    # private function that sets the rasters of all products
+    def __set_products(self):
+        nx, ny, nz = self.grid.shape
+        volume, coordinates = self.grid.get_volume_view()
+        counts = volume[:, :, :, 1]
+
+        # only the calc_points are evaluated, the cells of the vehicle and not evaluated cells are masked
+        calc = np.zeros(self.grid.points.shape[0], dtype=bool)
+        calc[self.grid.outside_indices.ravel()] = True
+        calc = calc.reshape(nz, ny, nx)
+
+        names = ("covered", "min_sensors", "max_sensors", "covered_cells")
+        rasters = {name: np.full((self.bands.shape[0], ny, nx), NO_DATA, dtype=np.uint8) for name in names}
+        for i, (z_min, z_max) in enumerate(self.bands):
+            levels = helpers.get_coordinate_range(coordinates["z"], z_min, z_max)
+            band_counts = counts[levels]
+            band_calc = calc[levels]
+            evaluated = np.any(band_calc, axis=0)
+
+            # values are clipped below NO_DATA, so they fit into uint8
+            covered_cells = np.sum((band_counts > 0) & band_calc, axis=0)
+            min_sensors = np.amin(np.where(band_calc, band_counts, NO_DATA), axis=0, initial=NO_DATA)
+            max_sensors = np.amax(np.where(band_calc, band_counts, 0), axis=0, initial=0)
+            values = dict(
+                covered=covered_cells > 0,
+                min_sensors=min_sensors,
+                max_sensors=max_sensors,
+                covered_cells=covered_cells,
+            )
+            for name in names:
+                rasters[name][i][evaluated] = np.clip(values[name][evaluated], 0, NO_DATA - 1)
+
+        self.products = rasters
@@ -0,0 +1,63 @@
+import numpy as np
+from scipy import ndimage
+
+from . import grid_helpers as helpers
+
+
+# this class labels the connected regions of blind cells (calc_points not covered by any sensor) of the grid on the
+# structured cells. cells are connected by their faces. for every region the volume, the bounding box and the minimum
+# distance to the vehicle are computed, the regions are sorted by volume in descending order
+class BlindRegions:
+    def __init__(self, grid):
+        self.grid = grid
+        self.labels = None
+        self.number = None
+        self.volume = None
+        self.bounds = None
+        self.vehicle_distance = None
+
+        # call function to set the regions
+        self.__set_regions()
+
+    # private function that labels the regions and sets their metrics
+    def __set_regions(self):
+        nx, ny, nz = self.grid.shape
+        data = self.grid.mesh.cell_data["sensorset"]
+        spacing = self.grid.mesh.spacing[0]
+        outside_indices = self.grid.outside_indices.ravel()
+
+        blind = np.zeros(data.shape[0], dtype=bool)
+        blind[outside_indices] = data[outside_indices, 1] == 0
+        vehicle = np.zeros(data.shape[0], dtype=bool)
+        vehicle[np.intersect1d(self.grid.car_points_indices, self.grid.remove_indices)] = True
+
+        # label the regions, label 0 are the cells that are not blind
+        labels, self.number = ndimage.label(blind.reshape(nz, ny, nx))
+        regions = np.arange(1, self.number + 1)
+
+        # volume of every region
+        cells = np.bincount(labels.ravel(), minlength=self.number + 1)[1:]
+
+        # bounding box (xmin, xmax, ymin, ymax, zmin, zmax) of the cells of every region
+        bounds = np.zeros((self.number, 6))
+        for i, region in enumerate(ndimage.find_objects(labels)):
+            for axis, index_range in zip((2, 1, 0), region):
+                bounds[i, 2 * axis] = index_range.start
+                bounds[i, 2 * axis + 1] = index_range.stop
+        bounds = np.repeat(np.array(self.grid.mesh.origin), 2) + bounds * spacing
+
+        # minimum distance of every region to the vehicle from the distance field of the vehicle cells
+        vehicle_distance = helpers.get_distance_field(vehicle.reshape(nz, ny, nx), spacing)
+        if self.number > 0:
+            distance = np.asarray(ndimage.minimum(vehicle_distance, labels, regions))
+        else:
+            distance = np.zeros(0)
+
+        # sort the regions by volume, so label 1 is the largest region
+        order = np.argsort(-cells, kind="stable")
+        relabel = np.zeros(self.number + 1, dtype=int)
+        relabel[order + 1] = regions
+        self.labels = relabel[labels]
+        self.volume = helpers.calculate_volumes(cells[order], spacing**3)
+        self.bounds = np.reshape([round(value, 2) for value in bounds[order].ravel().tolist()], bounds.shape)
+        self.vehicle_distance = np.reshape([round(value, 2) for value in distance[order].tolist()], distance.shape)
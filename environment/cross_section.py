@@ -0,0 +1,120 @@
+import numpy as np
+from scipy.spatial import ConvexHull
+
+from . import grid_helpers as helpers
+from sensors.sensor import TECHNOLOGIES
+
+
+# this class computes the blind area and the blind distances of a horizontal cross-section at a height independent of
+# the grid. the cross-section is scanned by lines in x and y direction, along every line the fov of the sensors, their
+# occlusion by the vehicle and the vehicle itself are exact intervals, so the distances are exact and the area is only
+# sampled by the distance of the lines (resolution). the metrics are named like the metrics of a slice
+class CrossSection:
+    def __init__(self, dim_x, dim_y, center, car, height, resolution=0.01, advanced=False):
+        self.bounds = np.array(
+            [center[0] - dim_x / 2, center[0] + dim_x / 2, center[1] - dim_y / 2, center[1] + dim_y / 2]
+        )
+        self.car = car
+        self.height = height
+        self.resolution = resolution
+        self.blind_area = None
+        self.x_max_rear = None
+        self.x_max_front = None
+        self.y_max_right = None
+        self.y_max_left = None
+        self.x_dist = None
+        self.y_dist = None
+
+        # the vehicle is the bounding box (mode normal) or the convex hull (mode advanced) as half-spaces
+        if advanced:
+            self.vehicle_equations = ConvexHull(car.points).equations
+        else:
+            car_bounds = np.reshape(car.bounds, (3, 2))
+            normals = np.vstack((np.eye(3), -np.eye(3)))
+            self.vehicle_equations = np.column_stack((normals, np.append(-car_bounds[:, 1], car_bounds[:, 0])))
+
+    # callable function that computes the blind area and the blind distances of the cross-section
+    def calculate_coverage(self, sensors, occlusion_mesh):
+        # the blind area is the sum of the blind lengths of the lines in x direction
+        segments = self.__get_segments("x", self.bounds[2:], self.bounds[:2], sensors, occlusion_mesh)
+        _, starts, ends, blind = segments[:4]
+        self.blind_area = round(float(np.sum(ends[blind] - starts[blind])) * self.resolution, 2)
+
+        # the distances to the first covered point are examined in an area of 4x the length/width of the car in
+        # direction, otherwise the size of the car (like the slices)
+        car_bounds = np.reshape(self.car.bounds, (3, 2)).astype(float)
+        self.x_dist = self.__get_distances("x", car_bounds, sensors, occlusion_mesh)
+        self.x_max_rear = np.amax(self.x_dist[:, 0], initial=0)
+        self.x_max_front = np.amax(self.x_dist[:, 1], initial=0)
+        self.y_dist = self.__get_distances("y", car_bounds, sensors, occlusion_mesh)
+        self.y_max_right = np.amax(self.y_dist[:, 0], initial=0)
+        self.y_max_left = np.amax(self.y_dist[:, 1], initial=0)
+
+    # private function that returns the distances (rear/right, front/left) of every line in direction from the vehicle
+    # to the first covered point. the lines without vehicle have the distances 0
+    def __get_distances(self, direction, car_bounds, sensors, occlusion_mesh):
+        axis = "xy".index(direction)
+        if not car_bounds[2, 0] <= self.height <= car_bounds[2, 1]:
+            return np.zeros((0, 2))
+        extent = np.clip(car_bounds[axis] * 4, self.bounds[2 * axis], self.bounds[2 * axis + 1])
+        across = np.clip(car_bounds[1 - axis], self.bounds[2 - 2 * axis], self.bounds[3 - 2 * axis])
+        lines, starts, ends, blind, vehicle, covered = self.__get_segments(direction, across, extent, sensors, occlusion_mesh)
+        n_lines = self.__get_positions(across).size
+
+        # first point of the vehicle, the last covered point before and the first covered point after it
+        first_vehicle = np.full(n_lines, np.inf)
+        np.minimum.at(first_vehicle, lines[vehicle], starts[vehicle])
+        before = covered & (ends <= first_vehicle[lines])
+        last_covered = np.full(n_lines, extent[0])
+        np.maximum.at(last_covered, lines[before], ends[before])
+        after = covered & (starts >= first_vehicle[lines])
+        next_covered = np.full(n_lines, extent[1])
+        np.minimum.at(next_covered, lines[after], starts[after])
+
+        # the rear distance is the blind length before the vehicle, the front distance the blind length between the
+        # vehicle and the next covered point
+        rear = np.where(np.isfinite(first_vehicle), first_vehicle - last_covered, 0)
+        front = np.zeros(n_lines)
+        between = blind & (starts >= first_vehicle[lines]) & (ends <= next_covered[lines])
+        np.add.at(front, lines[between], ends[between] - starts[between])
+        distances = np.column_stack((rear, front))
+        return np.reshape([round(value, 2) for value in distances.ravel().tolist()], distances.shape)
+
+    # private function that returns the positions of the lines between low and high with the distance resolution
+    def __get_positions(self, bounds):
+        return bounds[0] + (np.arange(int((bounds[1] - bounds[0]) / self.resolution)) + 0.5) * self.resolution
+
+    # private function that scans the lines in direction at the positions across between extent. returns the segments
+    # (line, start, end) between all borders of the intervals of the lines and whether a segment is blind, vehicle or
+    # covered by any sensor
+    def __get_segments(self, direction, across, extent, sensors, occlusion_mesh):
+        axis = "xy".index(direction)
+        positions = self.__get_positions(across)
+        origins = np.zeros((positions.size, 3))
+        origins[:, 1 - axis] = positions
+        origins[:, 2] = self.height
+        unit = np.eye(3)[axis]
+
+        # intervals of the examined extent, the vehicle and the coverage of every sensor labeled by its technology
+        n_lines = positions.size
+        intervals = [(np.arange(n_lines), np.full(n_lines, extent[0]), np.full(n_lines, extent[1]), 0)]
+        low, high, inside = helpers.get_line_clip(origins, unit, self.vehicle_equations)
+        intervals.append((np.nonzero(inside)[0], low[inside], high[inside], 1))
+        n_technologies = len(TECHNOLOGIES)
+        for sensor in sensors:
+            technology = sensor.get_technology()
+            label = 2 + (technology if technology >= 0 else n_technologies)
+            intervals.append((*sensor.get_line_intervals(origins, unit, extent[0], extent[1], occlusion_mesh), label))
+
+        lines, starts, ends, counts = helpers.sweep_intervals(
+            np.concatenate([interval[0] for interval in intervals]),
+            np.concatenate([interval[1] for interval in intervals]),
+            np.concatenate([interval[2] for interval in intervals]),
+            np.concatenate([np.full(interval[0].size, interval[3]) for interval in intervals]),
+            3 + n_technologies,
+        )
+        examined = counts[:, 0] > 0
+        vehicle = examined & (counts[:, 1] > 0)
+        covered = examined & np.invert(vehicle) & (np.sum(counts[:, 2:], axis=1) > 0)
+        blind = examined & np.invert(vehicle) & np.invert(covered)
+        return lines, starts, ends, blind, vehicle, covered
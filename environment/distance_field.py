@@ -0,0 +1,58 @@
+import numpy as np
+from scipy import ndimage
+
+from . import grid_helpers as helpers
+
+
+# this class computes the euclidean distance fields of the grid with a distance transform of the structured cells.
+# coverage_distance contains for every cell the distance to the nearest covered cell, vehicle_distance the distance to
+# the nearest cell of the vehicle. both fields have the shape (nz, ny, nx) of the cells
+class DistanceField:
+    def __init__(self, grid):
+        self.grid = grid
+        self.coverage_distance = None
+        self.vehicle_distance = None
+        self.blind_distances = None
+        self.surface_distances = None
+        self.max_blind_distance = None
+        self.mean_blind_distance = None
+        self.max_surface_distance = None
+        self.mean_surface_distance = None
+        self.min_surface_distance = None
+
+        # call function to set the fields and metrics
+        self.__set_metrics()
+
+    # private function that sets the distance fields and the metrics
+    def __set_metrics(self):
+        nx, ny, nz = self.grid.shape
+        data = self.grid.mesh.cell_data["sensorset"]
+        spacing = self.grid.mesh.spacing[0]
+
+        # covered cells are the calc_points with at least one sensor, the vehicle cells are the removed car cells
+        outside_indices = self.grid.outside_indices.ravel()
+        covered = np.zeros(data.shape[0], dtype=bool)
+        covered[outside_indices] = data[outside_indices, 1] > 0
+        covered = covered.reshape(nz, ny, nx)
+        vehicle = np.zeros(data.shape[0], dtype=bool)
+        vehicle[np.intersect1d(self.grid.car_points_indices, self.grid.remove_indices)] = True
+        vehicle = vehicle.reshape(nz, ny, nx)
+
+        # distance of every cell to the nearest covered cell and to the nearest vehicle cell
+        self.coverage_distance = helpers.get_distance_field(covered, spacing)
+        self.vehicle_distance = helpers.get_distance_field(vehicle, spacing)
+
+        # distances of the blind cells to the coverage and of the surface of the vehicle to the first coverage. the
+        # surface cells are the vehicle cells with a neighbour outside of the vehicle
+        blind = np.zeros(data.shape[0], dtype=bool)
+        blind[outside_indices] = data[outside_indices, 1] == 0
+        self.blind_distances = self.coverage_distance[blind.reshape(nz, ny, nx)]
+        surface = vehicle & np.invert(ndimage.binary_erosion(vehicle, border_value=1))
+        self.surface_distances = self.coverage_distance[surface]
+
+        self.max_blind_distance = round(float(np.amax(self.blind_distances, initial=0)), 2)
+        self.mean_blind_distance = round(float(np.mean(self.blind_distances)), 2) if self.blind_distances.size else 0.0
+        if self.surface_distances.size:
+            self.max_surface_distance = round(float(np.amax(self.surface_distances)), 2)
+            self.mean_surface_distance = round(float(np.mean(self.surface_distances)), 2)
+            self.min_surface_distance = round(float(np.amin(self.surface_distances)), 2)
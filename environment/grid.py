@@ -1,8 +1,32 @@
 import numpy as np
 import pyvista as pv
-from scipy.spatial import ConvexHull, Delaunay
+from scipy.spatial import cKDTree
 
 from . import grid_helpers as helpers
+from .zones import get_zone_mask
+from sensors.sensor import TECHNOLOGIES
+
+
+# function that returns the columns of the cell data counting sensors and the names of their conditions: N1 (number of
+# sensors), N2 (number of technologies) and N<6 + t> for the number of sensors of technology t (N6 cameras, N7 lidars,
+# N8 radars, then the registered technologies)
+def get_count_columns(n_columns):
+    n_technologies = (n_columns - 3) // 2
+    columns = [1, 2] + [3 + n_technologies + t for t in range(n_technologies)]
+    names = ["N1", "N2"] + [f"N{6 + t}" for t in range(n_technologies)]
+    return columns, names
+
+
+# function that returns the lowest and highest value of every column of the cell data fulfilling its metric for the
+# conditions, e.g. {"N1": 3, "N6": 2}. the columns counting sensors fulfill their metric from their condition on (1 if
+# it is not given), the other columns if the point is covered. used by the grid and the results, so both agree
+def get_column_conditions(n_columns, car_value, conditions):
+    lower = np.ones(n_columns)
+    upper = np.ones(n_columns)
+    for column, name in zip(*get_count_columns(n_columns)):
+        lower[column] = conditions.get(name, 1)
+        upper[column] = car_value
+    return lower, upper
 
 
 # this class models the environment of the vehicle as a uniform grid
@@ -37,15 +61,22 @@ class Grid:
         self.outside_indices = None
         self.remove_indices = None
         self.metrics = np.zeros(shape=(18, 9))
+        self.histograms = None
+        self.conditions = None
         self.blind_spot_volume = None
         self.blind_spots = None
-        self.car_area_indices = np.empty(1, dtype=np.int8)
+        self.car_area_indices = np.empty(0, dtype=int)
+        self.zone_names = []
+        self.zone_masks = None
 
         # if-clause to set the points used for calculation as the vertices or the cell centers of the grid
+        # shape is the number of points in x, y and z direction. the points are ordered with x running fastest
         if not cells:
             self.points = self.mesh.points
+            self.shape = (x + 1, y + 1, z + 1)
         else:
             self.points = self.mesh.cell_centers().points
+            self.shape = (x, y, z)
 
         # define, which points are inside the vehicle and shall not be used for calculation (mode normal)
         self.car_points_indices = helpers.get_bounding_box_indices(
@@ -87,263 +118,33 @@ class Grid:
         # remove the points at remove_indices for the calculation
         self.calc_points = np.delete(self.points, self.remove_indices, axis=0)
 
-        # ------------------------------- surrounding Area indices are set in this block ------------------------------
-        bounds = self.car.bounds
-        corner_fl = np.array([bounds[1], bounds[3], 0])
-        corner_fr = np.array([bounds[1], bounds[2], 0])
-        corner_rl = np.array([bounds[0], bounds[3], 0])
-        corner_rr = np.array([bounds[0], bounds[2], 0])
-
-        # first assume every area is a rectangular box and set the indices
-        self.far_front_left_indices = helpers.get_bounding_box_indices(
-            self.points,
-            (
-                bounds[1],
-                center[0] + dim_x / 2,
-                bounds[3],
-                center[1] + dim_y / 2,
-                0,
-                center[2] + dim_z,
-            ),
-        )[0]
-
-        self.far_front_center_indices = helpers.get_bounding_box_indices(
-            self.points,
-            (
-                bounds[1] + dist,
-                center[0] + dim_x / 2,
-                bounds[2],
-                bounds[3],
-                0,
-                center[2] + dim_z,
-            ),
-        )[0]
-
-        self.far_front_right_indices = helpers.get_bounding_box_indices(
-            self.points,
-            (
-                bounds[1],
-                center[0] + dim_x / 2,
-                center[1] - dim_y / 2,
-                bounds[2],
-                0,
-                center[2] + dim_z,
-            ),
-        )[0]
-
-        self.near_front_left_indices = helpers.get_bounding_box_indices(
-            self.points,
-            (
-                bounds[1],
-                center[0] + dim_x / 2,
-                bounds[3],
-                center[1] + dim_y / 2,
-                0,
-                center[2] + dim_z,
-            ),
-        )[0]
-
-        self.near_front_center_indices = helpers.get_bounding_box_indices(
-            self.points,
-            (bounds[1], bounds[1] + dist, bounds[2], bounds[3], 0, center[2] + dim_z),
-        )[0]
-
-        self.near_front_right_indices = helpers.get_bounding_box_indices(
-            self.points,
-            (
-                bounds[1],
-                center[0] + dim_x / 2,
-                center[1] - dim_y / 2,
-                bounds[2],
-                0,
-                center[2] + dim_z,
-            ),
-        )[0]
-
-        self.far_left_indices = helpers.get_bounding_box_indices(
-            self.points,
-            (
-                bounds[0],
-                bounds[1],
-                bounds[3] + dist,
-                center[1] + dim_y / 2,
-                0,
-                center[2] + dim_z,
-            ),
-        )[0]
-
-        self.near_left_indices = helpers.get_bounding_box_indices(
-            self.points,
-            (bounds[0], bounds[1], bounds[3], bounds[3] + dist, 0, center[2] + dim_z),
-        )[0]
-
-        self.near_right_indices = helpers.get_bounding_box_indices(
-            self.points,
-            (bounds[0], bounds[1], bounds[2] - dist, bounds[2], 0, center[2] + dim_z),
-        )[0]
-
-        self.far_right_indices = helpers.get_bounding_box_indices(
-            self.points,
-            (
-                bounds[0],
-                bounds[1],
-                center[1] - dim_y / 2,
-                bounds[2] - dist,
-                0,
-                center[2] + dim_z,
-            ),
-        )[0]
-
-        self.near_rear_left_indices = helpers.get_bounding_box_indices(
-            self.points,
-            (
-                center[0] - dim_x / 2,
-                bounds[0],
-                bounds[3],
-                center[1] + dim_y / 2,
-                0,
-                center[2] + dim_z,
-            ),
-        )[0]
-
-        self.near_rear_center_indices = helpers.get_bounding_box_indices(
-            self.points,
-            (bounds[0] - dist, bounds[0], bounds[2], bounds[3], 0, center[2] + dim_z),
-        )[0]
-
-        self.near_rear_right_indices = helpers.get_bounding_box_indices(
+        # ------------------------------- surrounding Area labels are set in this block ------------------------------
+        # every point gets the label of its surrounding area as defined in plot_helpers.areas, -1 if it is in no area
+        self.area_label = helpers.get_area_labels(
             self.points,
+            self.car.bounds,
             (
                 center[0] - dim_x / 2,
-                bounds[0],
+                center[0] + dim_x / 2,
                 center[1] - dim_y / 2,
-                bounds[2],
-                0,
-                center[2] + dim_z,
-            ),
-        )[0]
-
-        self.far_rear_left_indices = helpers.get_bounding_box_indices(
-            self.points,
-            (
-                center[0] - dim_x / 2,
-                bounds[0],
-                bounds[3],
                 center[1] + dim_y / 2,
                 0,
                 center[2] + dim_z,
             ),
-        )[0]
-
-        self.far_rear_center_indices = helpers.get_bounding_box_indices(
-            self.points,
-            (
-                center[0] - dim_x / 2,
-                bounds[0] - dist,
-                bounds[2],
-                bounds[3],
-                0,
-                center[2] + dim_z,
-            ),
-        )[0]
-
-        self.far_rear_right_indices = helpers.get_bounding_box_indices(
-            self.points,
-            (
-                center[0] - dim_x / 2,
-                bounds[0],
-                center[1] - dim_y / 2,
-                bounds[2],
-                0,
-                center[2] + dim_z,
-            ),
-        )[0]
-
-        # now further edit the indices of the areas that are not rectangular
-
-        # for the 4 center areas add the angular pieces left and right of the rectangular box
-        self.near_front_center_indices = np.hstack(
-            (
-                self.near_front_center_indices,
-                self.__get_corner_indices(
-                    self.near_front_right_indices, corner_fr, dist, -alpha, 0
-                ),
-                self.__get_corner_indices(
-                    self.near_front_left_indices, corner_fl, dist, 0, alpha
-                ),
-            )
-        )
-        self.far_front_center_indices = np.hstack(
-            (
-                self.far_front_center_indices,
-                self.__get_corner_indices(
-                    self.near_front_right_indices, corner_fr, dist, -alpha, 0, far=True
-                ),
-                self.__get_corner_indices(
-                    self.near_front_left_indices, corner_fl, dist, 0, alpha, far=True
-                ),
-            )
-        )
-        self.near_rear_center_indices = np.hstack(
-            (
-                self.near_rear_center_indices,
-                self.__get_corner_indices(
-                    self.near_rear_right_indices, corner_rr, dist, -180, -180 + beta
-                ),
-                self.__get_corner_indices(
-                    self.near_rear_left_indices, corner_rl, dist, 180 - beta, 180
-                ),
-            )
+            dist,
+            alpha,
+            beta,
         )
-        self.far_rear_center_indices = np.hstack(
-            (
-                self.far_rear_center_indices,
-                self.__get_corner_indices(
-                    self.far_rear_right_indices,
-                    corner_rr,
-                    dist,
-                    -180,
-                    -180 + beta,
-                    far=True,
-                ),
-                self.__get_corner_indices(
-                    self.far_rear_left_indices,
-                    corner_rl,
-                    dist,
-                    180 - beta,
-                    180,
-                    far=True,
-                ),
-            )
-        )
-
-        # for the 8 corner areas only keep the indices of the rectangular box, that are within the specified angles
-        # (alpha and beta) and distances
-        self.near_front_left_indices = self.__get_corner_indices(
-            self.near_front_left_indices, corner_fl, dist, alpha, 90
-        )
-        self.far_front_left_indices = self.__get_corner_indices(
-            self.far_front_left_indices, corner_fl, dist, alpha, 90, far=True
-        )
-        self.near_front_right_indices = self.__get_corner_indices(
-            self.near_front_right_indices, corner_fr, dist, -90, -alpha
-        )
-        self.far_front_right_indices = self.__get_corner_indices(
-            self.far_front_right_indices, corner_fr, dist, -90, -alpha, far=True
-        )
-        self.near_rear_left_indices = self.__get_corner_indices(
-            self.near_rear_left_indices, corner_rl, dist, 90, 180 - beta
-        )
-        self.far_rear_left_indices = self.__get_corner_indices(
-            self.far_rear_left_indices, corner_rl, dist, 90, 180 - beta, far=True
-        )
-        self.near_rear_right_indices = self.__get_corner_indices(
-            self.near_rear_right_indices, corner_rr, dist, -180 + beta, -90
-        )
-        self.far_rear_right_indices = self.__get_corner_indices(
-            self.far_rear_right_indices, corner_rr, dist, -180 + beta, -90, far=True
+        if advanced:
+            car_area = self.car_area_indices[self.area_label[self.car_area_indices] == -1]
+            self.area_label[car_area] = 16
+        self.calc_area_label = self.area_label[self.outside_indices.ravel()]
+        # number of points in every area, the total area (17) consists of all calc_points
+        self.area_sizes = np.append(
+            np.bincount(self.area_label.astype(int) + 1, minlength=18)[1:],
+            self.calc_points.shape[0],
         )
-        # ------------------------------- surrounding Area indices setting is done -----------------------------------
+        # ------------------------------- surrounding Area labels setting is done ------------------------------------
 
     # callable function to create a cross-section of the grid using the pyvista slice
     def slice_coordinate_axis(self, dist, normal="z"):
@@ -356,18 +157,70 @@ class Grid:
         my_slice = self.mesh.slice(normal, origin=origin)
         return my_slice
 
+    # callable function that returns the cell data as a (nz, ny, nx, columns) view of the structured cells and the
+    # coordinates of the cell centers along x, y and z in ascending order
+    def get_volume_view(self):
+        nx, ny, nz = self.shape
+        data = self.mesh.cell_data["sensorset"]
+        centers = self.points.reshape(nz, ny, nx, 3)
+        coordinates = dict(x=centers[0, 0, :, 0], y=centers[0, :, 0, 1], z=centers[:, 0, 0, 2])
+        return data.reshape(nz, ny, nx, data.shape[1]), coordinates
+
+    # callable function that returns an axis-aligned cross-section of the cell data as a view of the structured cells.
+    # the cells are ordered with x running fastest, so the cell data is a (nz, ny, nx, columns) array and a slice is one
+    # index along an axis. like the vtk slice, the cells cut by the plane at dist are used and a plane on a cell border
+    # belongs to the lower cell. returns the view (rows, columns, data columns), the axes of the rows and columns and
+    # their coordinates in ascending order
+    def get_slice_view(self, dist, normal="z"):
+        axis = "xyz".index(normal)
+        borders = self.mesh.origin[axis] + np.arange(self.shape[axis] + 1) * self.mesh.spacing[axis]
+        index = np.searchsorted(borders, dist) - 1
+        if index < 0 or index >= self.shape[axis]:
+            raise ValueError(f"The slice {normal} = {dist} does not cut the grid")
+
+        volume, coordinates = self.get_volume_view()
+        if normal == "x":
+            view, axes = volume[:, :, index], ("z", "y")
+        elif normal == "y":
+            view, axes = volume[:, index, :], ("z", "x")
+        else:
+            view, axes = volume[index], ("y", "x")
+
+        return view, axes, (coordinates[axes[0]], coordinates[axes[1]])
+
+    # callable function that returns for every calc_point the index of its mirror image about the xz-plane (y = 0).
+    # None is returned, if the grid or the vehicle are not symmetric, so the caller can fall back to the full calculation.
+    # the vehicle is compared with vehicle_tolerance (default tolerance), which has to be loosened for real vehicle meshes
+    def get_mirror_indices(self, tolerance=1e-3, vehicle_tolerance=None):
+        # the lattice has to be symmetric about y = 0
+        if abs(self.points[0, 1] + self.points[-1, 1]) > tolerance:
+            return None
+
+        # the vehicle has to be symmetric, so every mirrored vertex needs a vertex of the vehicle at the same position
+        car_points = np.asarray(self.car.points)
+        distances = cKDTree(car_points).query(car_points * np.array([1, -1, 1]))[0]
+        if np.amax(distances) > (tolerance if vehicle_tolerance is None else vehicle_tolerance):
+            return None
+
+        # mirror the indices of all points by reversing the y axis of the lattice, then translate them to calc_points
+        nx, ny, nz = self.shape
+        mirrored = np.arange(self.points.shape[0]).reshape(nz, ny, nx)[:, ::-1, :].ravel()
+        outside_indices = self.outside_indices.ravel()
+        calc_indices = np.full(self.points.shape[0], -1)
+        calc_indices[outside_indices] = np.arange(outside_indices.size)
+        mirror_indices = calc_indices[mirrored[outside_indices]]
+
+        # points removed on one side but not on the other side break the symmetry
+        if np.any(mirror_indices < 0):
+            return None
+        return mirror_indices
+
     # private function, that creates the convex hull of the corresponding vehicle and checks, which points are inside
     # the indices of the points, that are inside are set as the remove_indices. function is only used if mode=advanced
     def __get_indices_advanced(self):
-        # create convex hull and delauney of convex hull vertices
-        hull = ConvexHull(self.car.points)
-        delaunay = Delaunay(self.car.points[hull.vertices])
-        points = self.points[self.car_points_indices]
-
-        # find the simplexes, simplex = -1 corresponds to outside of the convex hull
-        simplexes = delaunay.find_simplex(points)
-        wrong_indices = np.where(simplexes == -1)[0]
-        self.remove_indices = np.delete(self.car_points_indices, wrong_indices)
+        # only the points inside the convex hull of the vehicle are removed
+        inside = helpers.get_convex_hull_mask(self.car.points, self.points[self.car_points_indices])
+        self.remove_indices = self.car_points_indices[inside]
         mask = np.ones(self.points.shape[0])
         mask[self.remove_indices] = False
         self.outside_indices = np.nonzero(mask)[0]
@@ -375,174 +228,296 @@ class Grid:
             self.outside_indices, (self.outside_indices.size, 1)
         )
 
-    # private function, that determines which points lie in an angular section
-    # is used to set the indices of the surrounding areas
-    def __get_corner_indices(
-        self, indices, corner, dist, angle_start, angle_end, far=False
-    ):
-        # get the vectors from corner to points in cylindrical coordinates
-        points = self.points[indices]
-        vectors = points - np.tile(corner, (indices.size, 1))
-        vectors = helpers.calculate_cyl_from_cart(vectors)
-
-        # check which points fulfill the conditions (first distance, then angle) and return their indices
-        if far:
-            dist = vectors[:, 0] >= dist
-        else:
-            dist = vectors[:, 0] <= dist
-        angle = np.logical_and(vectors[:, 1] <= angle_end, vectors[:, 1] >= angle_start)
-        vectors_bool = np.vstack((dist, angle))
-        result = np.all(vectors_bool, axis=0)
-        indices = indices[np.nonzero(result)[0]]
-
-        return indices
-
     # callable function that combines the calculated data of each sensor using addition and boolean operations
     # the obtained data describes the coverage of the total sensorset and is stored as cell_data in self.mesh
     def combine_data(self, sensors):
-        combined_results = np.zeros((self.calc_points.shape[0], 9))
-
-        # for every sensor combine their calculation result to get the combined results
-        for sensor in sensors:
-            combined_results[:, 0] = np.logical_or(
-                combined_results[:, 0], sensor.calculation_result
-            )
-            combined_results[:, 1] += sensor.calculation_result
-
-            if sensor.__class__.__name__ == "Camera":
-                combined_results[:, 3] = np.logical_or(
-                    combined_results[:, 3], sensor.calculation_result
-                )
-                combined_results[:, 6] += sensor.calculation_result
-            elif sensor.__class__.__name__ == "Lidar":
-                combined_results[:, 4] = np.logical_or(
-                    combined_results[:, 4], sensor.calculation_result
-                )
-                combined_results[:, 7] += sensor.calculation_result
-            elif sensor.__class__.__name__ == "Radar":
-                combined_results[:, 5] = np.logical_or(
-                    combined_results[:, 5], sensor.calculation_result
-                )
-                combined_results[:, 8] += sensor.calculation_result
-
-            combined_results[:, 2] = (
-                combined_results[:, 3] + combined_results[:, 4] + combined_results[:, 5]
-            )
+        coverage = np.zeros((len(sensors), self.calc_points.shape[0]), dtype=bool)
+        for i, sensor in enumerate(sensors):
+            coverage[i] = sensor.calculation_result
+        technologies = [sensor.get_technology() for sensor in sensors]
+        combined_results = helpers.combine_results(coverage, technologies, len(TECHNOLOGIES))
 
         # for the calculation, only the calc_points are used. Now the combined results are combined with the points
         # corresponding to the car, to obtain same number of rows as self.points. For each point of the car a scalar
         # value (max value that appears in combined data +1) is set
-        expanded_data = np.full((self.points.shape[0], 9), -1)
-        self.car_value = int(np.amax(combined_results[:, 1])) + 1
+        expanded_data = np.full((self.points.shape[0], combined_results.shape[1]), -1)
+        self.car_value = int(np.amax(combined_results[:, 1], initial=0)) + 1
         expanded_data[self.car_points_indices, :] = self.car_value
-        np.put_along_axis(expanded_data, self.outside_indices, combined_results, axis=0)
+        expanded_data[self.outside_indices.ravel(), :] = combined_results
+        if self.metrics.shape[1] != combined_results.shape[1]:
+            self.metrics = np.zeros(shape=(18, combined_results.shape[1]))
 
         self.mesh.cell_data["sensorset"] = expanded_data
+        self.compute_histograms()
+
+    # callable function that computes for every area and every column of the cell data a histogram of the values, so
+    # histograms[area, column, k] is the number of points of the area with value k. like the cell data, it is computed
+    # once after combining the sensor data. every metric can then be queried from the histograms without the cell data
+    def compute_histograms(self):
+        self.histograms = self.__count_values(np.arange(self.points.shape[0]))
+
+    # private function that counts the values of the given points grouped by area, column and value, including the
+    # total area. the result has the shape of the histograms
+    def __count_values(self, indices):
+        data = self.mesh.cell_data["sensorset"][indices].astype(int)
+        columns = data.shape[1]
+        bins = self.car_value + 1
+        valid = data >= 0
+
+        # count the values grouped by area and column with a single bincount, label -1 (no area) is shifted to group 0
+        keys = (self.area_label[indices].astype(int)[:, np.newaxis] + 1) * columns + np.arange(columns)
+        keys = keys * bins + data
+        histograms = np.bincount(keys[valid], minlength=18 * columns * bins)
+        histograms = histograms.reshape(18, columns, bins)
+
+        # for the total area use all points
+        total_points = indices != self.points.shape[0] - 1
+        keys = np.arange(columns) * bins + data[total_points]
+        total = np.bincount(keys[valid[total_points]], minlength=columns * bins)
+        return np.concatenate((histograms[1:], total.reshape(1, columns, bins)))
+
+    # callable function that replaces the contribution of the sensor old by the sensor new in the combined data, the
+    # histograms and the set metrics, without combining all sensors again. the coverage of new has to be calculated
+    # before, e.g. with new.calculate_coverage(grid, vehicle). old or new can be None to only remove or add a sensor
+    def update_sensor(self, old, new):
+        data = self.mesh.cell_data["sensorset"]
+        n_technologies = (data.shape[1] - 3) // 2
+        no_result = np.zeros(self.calc_points.shape[0], dtype=bool)
+        old_result = no_result if old is None else old.calculation_result
+        new_result = no_result if new is None else new.calculation_result
+        old_technology = -1 if old is None else old.get_technology()
+        new_technology = -1 if new is None else new.get_technology()
+
+        # only the points covered by exactly one of both sensors change, and the points covered by both sensors if
+        # their technologies differ
+        changed = old_result != new_result
+        if old_technology != new_technology:
+            changed |= old_result & new_result
+        changed = np.nonzero(changed)[0]
+        indices = self.outside_indices.ravel()[changed]
+        old_result = old_result[changed].astype(int)
+        new_result = new_result[changed].astype(int)
+
+        # update the counts of the changed points, then the columns derived from the counts
+        values = np.array(data[indices])
+        values[:, 1] += new_result - old_result
+        if old_technology >= 0:
+            values[:, 3 + n_technologies + old_technology] -= old_result
+        if new_technology >= 0:
+            values[:, 3 + n_technologies + new_technology] += new_result
+        values[:, 0] = values[:, 1] > 0
+        values[:, 3 : 3 + n_technologies] = values[:, 3 + n_technologies :] > 0
+        values[:, 2] = np.sum(values[:, 3 : 3 + n_technologies], axis=1)
+
+        # the histograms are updated by removing the old and adding the new values of the changed points. if the
+        # maximum number of sensors changes, the car value changes and the histograms are computed again
+        self.histograms -= self.__count_values(indices)
+        data[indices] = values
+        car_value = int(np.amax(data[self.outside_indices.ravel(), 1], initial=0)) + 1
+        if car_value != self.car_value:
+            self.car_value = car_value
+            data[np.intersect1d(self.car_points_indices, self.remove_indices)] = self.car_value
+            self.compute_histograms()
+        else:
+            self.histograms += self.__count_values(indices)
+
+        # only the metrics of the areas containing changed points and the total area change
+        if self.conditions is not None:
+            areas = np.append(np.unique(self.area_label[indices]), 17)
+            areas = areas[areas >= 0]
+            columns = np.nonzero(np.invert(np.isnan(self.conditions[0])))[0]
+            result = self.compute_metrics(
+                np.nan_to_num(self.conditions[0], nan=1), np.nan_to_num(self.conditions[1], nan=1)
+            )
+            self.metrics[np.ix_(areas, columns)] = result[np.ix_(areas, columns)]
+        if self.blind_spots is not None:
+            self.set_blind_spots()
 
-    # callable function, that sets the metrics with no condition
-    def set_metrics_no_condition(self, metrics_array=None, all_metrics=True):
+    # callable function, that sets the points and the volume of the cells that are not covered by any sensor
+    def set_blind_spots(self):
         blind_spot_indices = np.nonzero(self.mesh.cell_data["sensorset"][:, 0] == 0)[0]
         self.blind_spots = self.points[blind_spot_indices]
         self.blind_spot_volume = round(
             blind_spot_indices.size * self.mesh.spacing[0] ** 3, 2
         )
 
-        # construct a matrix that defines in which order the metrics are set. first traverse areas, then metrics
+    # callable function, that sets the metrics with no condition
+    def set_metrics_no_condition(self, metrics_array=None, all_metrics=True):
+        self.set_blind_spots()
+
+        # construct a matrix that defines which metrics are set. column 0 contains the areas, column 1 the metrics
         if all_metrics:
-            array1 = np.repeat(np.arange(18), 4, axis=0)
-            array2 = np.tile(np.array([[0, 3, 4, 5]]), (1, 18)).T
+            n_technologies = (self.histograms.shape[1] - 3) // 2
+            columns = [0] + [3 + t for t in range(n_technologies)]
+            array1 = np.repeat(np.arange(18), len(columns), axis=0)
+            array2 = np.tile(np.array([columns]), (1, 18)).T
             metrics_array = np.column_stack((array1, array2))
 
-        # traverse through the matrix and calculate the metrics
-        for row in metrics_array:
-            area_indices = self.__get_area_indices(row[0])
-            area_data = self.mesh.cell_data["sensorset"][:, row[1]][area_indices]
-
-            # check which points are covered (which elements equal to 1)
-            covered = np.nonzero(area_data == 1)[0]
-            if row[0] == 17:
-                # for the total area divide number of covered points by the number of calc_points
-                self.metrics[17, row[1]] = round(
-                    (covered.size / self.calc_points.shape[0]) * 100, 1
-                )
-            else:
-                # for the areas divide number of covered points by the number of points inside the area
-                self.metrics[row[0], row[1]] = round(
-                    (covered.size / area_indices.size) * 100, 1
-                )
+        # a point is covered, if its value equals 1
+        metrics_array = np.asarray(metrics_array, dtype=int)
+        self.__set_conditions(metrics_array[:, 1], 1, 1)
+        result = self.compute_metrics(np.ones(self.histograms.shape[1]), np.ones(self.histograms.shape[1]))
+        self.metrics[metrics_array[:, 0], metrics_array[:, 1]] = result[
+            metrics_array[:, 0], metrics_array[:, 1]
+        ]
 
     # callable function, that sets the metrics with a condition. conditions can be passed, otherwise defaults are used
     def set_metrics_condition(
         self, metrics_array=None, all_metrics=True, n1=3, n2=2, n6=2, n7=2, n8=2
     ):
-        # construct a matrix, that defines in which order the metrics are set. column 0 contains the areas,
-        # column 1 contains the metrics, column 2 contains the start condition, column 3 contains the end condition
+        # construct a matrix, that defines which metrics are set. column 0 contains the areas, column 1 contains the
+        # metrics, column 2 contains the start condition, column 3 contains the end condition
         if all_metrics:
-            areas = np.repeat(np.arange(18), 5, axis=0)
-            metrics = np.tile(np.array([[1, 2, 6, 7, 8]]), (1, 18)).T
-            start_cond = np.tile(np.array([n1, n2, n6, n7, n8]), (1, 18)).T
-            end_cond = np.full((90, 1), self.car_value)
+            columns = get_count_columns(self.histograms.shape[1])[0]
+            lower = self.__get_query_conditions(n1, n2, n6, n7, n8)[0]
+            areas = np.repeat(np.arange(18), len(columns), axis=0)
+            metrics = np.tile(np.array([columns]), (1, 18)).T
+            start_cond = np.tile(np.array([lower[columns]]), (1, 18)).T
+            end_cond = np.full((18 * len(columns), 1), self.car_value)
 
             metrics_array = np.column_stack((areas, metrics, start_cond, end_cond))
 
-        # traverse through the matrix and calculate the metrics accordingly
-        for row in metrics_array:
-            area_indices = self.__get_area_indices(row[0])
-
-            # check, that start and end condition are fulfilled
-            cond1 = self.mesh.cell_data["sensorset"][:, row[1]][area_indices] >= row[2]
-            cond2 = self.mesh.cell_data["sensorset"][:, row[1]][area_indices] <= row[3]
-            covered = np.nonzero(np.logical_and(cond1, cond2))[0]
-            if row[0] == 17:
-                # for the total area divide number of covered points by the number of calc_points
-                self.metrics[17, row[1]] = round(
-                    (covered.size / self.calc_points.shape[0]) * 100, 1
-                )
-            else:
-                # for the areas divide number of covered points by the number of points inside the area
-                self.metrics[row[0], row[1]] = round(
-                    (covered.size / area_indices.size) * 100, 1
-                )
-
-    # helper function used to translate from integers to the corresponding area indices
-    def __get_area_indices(self, index):
-        area_indices = None
-        match index:
-            case 0:
-                area_indices = self.far_front_left_indices
-            case 1:
-                area_indices = self.far_front_center_indices
-            case 2:
-                area_indices = self.far_front_right_indices
-            case 3:
-                area_indices = self.near_front_left_indices
-            case 4:
-                area_indices = self.near_front_center_indices
-            case 5:
-                area_indices = self.near_front_right_indices
-            case 6:
-                area_indices = self.far_left_indices
-            case 7:
-                area_indices = self.near_left_indices
-            case 8:
-                area_indices = self.near_right_indices
-            case 9:
-                area_indices = self.far_right_indices
-            case 10:
-                area_indices = self.near_rear_left_indices
-            case 11:
-                area_indices = self.near_rear_center_indices
-            case 12:
-                area_indices = self.near_rear_right_indices
-            case 13:
-                area_indices = self.far_rear_left_indices
-            case 14:
-                area_indices = self.far_rear_center_indices
-            case 15:
-                area_indices = self.far_rear_right_indices
-            case 16:
-                area_indices = self.car_area_indices
-            case 17:
-                area_indices = np.arange(self.points.shape[0] - 1)
-
-        return area_indices
+        # the conditions are set per metric (column of the cell data), all areas are then calculated in one pass
+        metrics_array = np.asarray(metrics_array, dtype=int)
+        # an end condition equal to the car value includes all values, which is kept if the car value changes later
+        end_cond = np.where(metrics_array[:, 3] == self.car_value, np.inf, metrics_array[:, 3])
+        self.__set_conditions(metrics_array[:, 1], metrics_array[:, 2], end_cond)
+        lower = np.ones(self.histograms.shape[1])
+        upper = np.ones(self.histograms.shape[1])
+        lower[metrics_array[:, 1]] = metrics_array[:, 2]
+        upper[metrics_array[:, 1]] = metrics_array[:, 3]
+        result = self.compute_metrics(lower, upper)
+        self.metrics[metrics_array[:, 0], metrics_array[:, 1]] = result[
+            metrics_array[:, 0], metrics_array[:, 1]
+        ]
+
+    # private function that stores the conditions of the set metrics per column, so they can be updated later
+    def __set_conditions(self, columns, lower, upper):
+        if self.conditions is None:
+            self.conditions = np.full((2, self.histograms.shape[1]), np.nan)
+        self.conditions[0, columns] = lower
+        self.conditions[1, columns] = upper
+
+    # callable function that computes the metrics of all areas and all columns of the cell data from the histograms. a
+    # point fulfills the metric of a column, if its value lies between lower and upper, which contain one value per
+    # column. returns a matrix with the percentage of points fulfilling the metric for every area (row) and column
+    def compute_metrics(self, lower, upper):
+        bins = self.histograms.shape[2]
+        columns = np.arange(self.histograms.shape[1])
+
+        # cumulative[area, column, k] is the number of points with a value below k, so every count is a difference
+        cumulative = np.zeros((18, columns.size, bins + 1), dtype=int)
+        cumulative[:, :, 1:] = np.cumsum(self.histograms, axis=2)
+        lower = np.clip(np.ceil(lower), 0, bins).astype(int)
+        upper = np.clip(np.floor(upper) + 1, 0, bins).astype(int)
+        counts = np.maximum(cumulative[:, columns, upper] - cumulative[:, columns, lower], 0)
+
+        return helpers.calculate_percentages(counts, self.area_sizes[:, np.newaxis])
+
+    # callable function that returns the full metrics matrix for the given conditions without setting it. columns
+    # without a condition contain the percentage of covered points. n6, n7 and n8 are the conditions for the number of
+    # cameras, lidars and radars, further registered technologies are evaluated with the condition 1
+    def query_metrics(self, n1=3, n2=2, n6=2, n7=2, n8=2):
+        return self.compute_metrics(*self.__get_query_conditions(n1, n2, n6, n7, n8))
+
+    # callable function that rasterizes user defined zones (see zones.load_zones) once on the calc_points. the masks are
+    # stored with one row per zone, so the metrics of all zones are computed without scanning the grid per zone
+    def set_zones(self, zones):
+        self.zone_names = [zone.name for zone in zones]
+        self.zone_masks = np.zeros((len(zones), self.calc_points.shape[0]), dtype=bool)
+        for i, zone in enumerate(zones):
+            self.zone_masks[i] = get_zone_mask(self.calc_points, zone)
+
+    # callable function that computes the metrics of all zones like compute_metrics. the points fulfilling the metric of
+    # every column are counted for all zones with a single product of the zone masks and the fulfilled metrics. returns
+    # a matrix with the percentage of points fulfilling the metric for every zone (row) and column
+    def compute_zone_metrics(self, lower, upper):
+        data = self.mesh.cell_data["sensorset"][self.outside_indices.ravel()]
+        fulfilled = (data >= np.asarray(lower)) & (data <= np.asarray(upper))
+        counts = np.matmul(self.zone_masks.astype(float), fulfilled.astype(float))
+        return helpers.calculate_percentages(
+            np.rint(counts).astype(int), np.sum(self.zone_masks, axis=1)[:, np.newaxis]
+        )
+
+    # callable function that returns the metrics matrix of all zones for the given conditions like query_metrics
+    def query_zone_metrics(self, n1=3, n2=2, n6=2, n7=2, n8=2):
+        return self.compute_zone_metrics(*self.__get_query_conditions(n1, n2, n6, n7, n8))
+
+    # private function that returns the lower and upper values of every column for the given conditions
+    def __get_query_conditions(self, n1, n2, n6, n7, n8):
+        conditions = dict(N1=n1, N2=n2, N6=n6, N7=n7, N8=n8)
+        return get_column_conditions(self.histograms.shape[1], self.car_value, conditions)
+
+    # callable function that computes the metrics of all sensors in one pass over their covered points, so the sensor
+    # results never have to be expanded to the size of the grid. returns a matrix with the percentage of covered points
+    # for every sensor (row) and area (column), and the covered and occluded volume of every sensor
+    def compute_sensor_metrics(self, sensors):
+        covered_indices = [sensor.covered_indices for sensor in sensors]
+        counts = self.__count_area_points(covered_indices)
+        metrics = helpers.calculate_percentages(counts, self.area_sizes)
+
+        # calculate volume metrics
+        cell_volume = self.mesh.spacing[0] ** 3
+        covered_volume = np.array([round(indices.size * cell_volume, 2) for indices in covered_indices])
+        occluded_volume = np.array(
+            [round(sensor.occluded_indices.size * cell_volume, 2) for sensor in sensors]
+        )
+
+        return metrics, covered_volume, occluded_volume
+
+    # callable function that computes the coverage of the sensorset after the failure of every single sensor in one
+    # pass (N-1 analysis). the points lost by the failure of a sensor are exactly its covered points with a count of 1.
+    # returns a matrix with the percentage of points that are still covered for every failed sensor (row) and area
+    # (column), and the lost volume and the blind spot volume after the failure of every sensor
+    def compute_failure_metrics(self, sensors):
+        data = self.mesh.cell_data["sensorset"]
+        counts = data[self.outside_indices.ravel(), 1]
+        lost_indices = [
+            sensor.covered_indices[counts[sensor.covered_indices] == 1] for sensor in sensors
+        ]
+        lost = self.__count_area_points(lost_indices)
+
+        # like in the histograms, the last point of the grid is not part of the total area
+        if self.outside_indices[-1, 0] == self.points.shape[0] - 1:
+            lost[:, 17] -= [np.count_nonzero(indices == counts.size - 1) for indices in lost_indices]
+        metrics = helpers.calculate_percentages(self.histograms[:, 0, 1] - lost, self.area_sizes)
+
+        # calculate volume metrics, the lost points are added to the blind spots of the sensorset
+        cell_volume = self.mesh.spacing[0] ** 3
+        blind_points = np.count_nonzero(data[:, 0] == 0)
+        lost_volume = np.array([round(indices.size * cell_volume, 2) for indices in lost_indices])
+        blind_spot_volume = np.array(
+            [round((blind_points + indices.size) * cell_volume, 2) for indices in lost_indices]
+        )
+
+        return metrics, lost_volume, blind_spot_volume
+
+    # callable function that computes the volume covered by both sensors for every pair of sensors. the diagonal
+    # contains the covered volume of every sensor. if by_area is set, a matrix is computed for every area including the
+    # total area (first axis), otherwise only the matrix of the total area is returned
+    def compute_overlap_matrix(self, sensors, by_area=False):
+        coverage = np.zeros((len(sensors), self.calc_points.shape[0]), dtype=bool)
+        for i, sensor in enumerate(sensors):
+            coverage[i] = sensor.calculation_result
+
+        shared = helpers.count_shared_points(coverage)
+        if by_area:
+            shared = np.stack(
+                [helpers.count_shared_points(coverage[:, self.calc_area_label == area]) for area in range(17)]
+                + [shared]
+            )
+
+        return helpers.calculate_volumes(shared, self.mesh.spacing[0] ** 3)
+
+    # private function that counts the given calc_points of every sensor grouped by area with a single bincount.
+    # returns a matrix with the number of points for every sensor (row) and area (column), including the total area
+    def __count_area_points(self, indices_list):
+        sizes = [indices.size for indices in indices_list]
+        sensor_ids = np.repeat(np.arange(len(indices_list)), sizes)
+        labels = self.calc_area_label[np.concatenate(indices_list + [np.empty(0, dtype=int)])]
+
+        # count the points grouped by sensor and area label, label -1 (no area) is shifted to group 0
+        counts = np.bincount(
+            sensor_ids * 18 + labels.astype(int) + 1, minlength=len(indices_list) * 18
+        ).reshape(len(indices_list), 18)
+        return np.column_stack((counts[:, 1:], sizes))
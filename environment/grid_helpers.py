@@ -1,8 +1,13 @@
 import math
 import numpy as np
+from scipy import ndimage
+from scipy.spatial import ConvexHull, Delaunay
 
 # this file contains helper functions that are used by different classes
 
+# number of set bits of every byte value, used as lookup table to count the bits of packed boolean arrays
+BIT_COUNTS = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
 
 # function that calculates the width of a cameras fov
 def calculate_width(max_dist, fov):
@@ -95,16 +100,384 @@ def calculate_cyl_from_cart(points):
     return new_points
 
 
-# function that determines, which indices of a given point matrix lie within and which lie without a rectangular
+# function that returns a boolean array which is true for the points of a given point matrix within a rectangular
 # bounding box. the bounding box is defined by the bounds (xmin, xmax, ymin, ymax, zmin, zmax)
-def get_bounding_box_indices(points, bounds):
+def get_bounding_box_mask(points, bounds):
     x = np.logical_and(points[:, 0] >= bounds[0], points[:, 0] <= bounds[1])
     y = np.logical_and(points[:, 1] >= bounds[2], points[:, 1] <= bounds[3])
     z = np.logical_and(points[:, 2] >= bounds[4], points[:, 2] <= bounds[5])
-    points_bool = np.vstack((x, y, z))
+    return x & y & z
+
+
+# function that returns a boolean array which is true for the points of a given point matrix whose x and y coordinates
+# lie within a polygon given by its corners [[x, y], ...], using the even-odd rule. the loop runs over the edges of the
+# polygon, every edge is tested against all points at once
+def get_polygon_mask(points, polygon):
+    polygon = np.asarray(polygon, dtype=float)
+    x = points[:, 0]
+    y = points[:, 1]
+    inside = np.zeros(points.shape[0], dtype=bool)
+    for (x1, y1), (x2, y2) in zip(polygon, np.roll(polygon, -1, axis=0)):
+        # an edge is crossed by the ray in positive x direction, if the point lies between its y values and left of it
+        crossing = (y1 > y) != (y2 > y)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_edge = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+        inside ^= crossing & (x < x_edge)
+    return inside
+
+
+# function that returns a boolean array which is true for the points of a given point matrix within an angular sector
+# around the center (x, y). radius and angle are the ranges (min, max) of the sector, the angle in degrees counter-
+# clockwise from the x axis between -180 and 180. a sector across 180 degrees has a min angle greater than the max angle
+def get_sector_mask(points, center, radius, angle):
+    cyl_points = calculate_cyl_from_cart(points - np.array([center[0], center[1], 0]))
+    in_radius = (cyl_points[:, 0] >= radius[0]) & (cyl_points[:, 0] <= radius[1])
+    if angle[0] <= angle[1]:
+        in_angle = (cyl_points[:, 1] >= angle[0]) & (cyl_points[:, 1] <= angle[1])
+    else:
+        in_angle = (cyl_points[:, 1] >= angle[0]) | (cyl_points[:, 1] <= angle[1])
+    return in_radius & in_angle
+
 
-    bounding_box_indices = np.nonzero(np.all(points_bool, axis=0))[0]
-    outside_indices = np.nonzero(np.all(points_bool, axis=0) == 0)[0]
+# function that determines, which indices of a given point matrix lie within and which lie without a rectangular
+# bounding box. the bounding box is defined by the bounds (xmin, xmax, ymin, ymax, zmin, zmax)
+def get_bounding_box_indices(points, bounds):
+    inside = get_bounding_box_mask(points, bounds)
+
+    bounding_box_indices = np.nonzero(inside)[0]
+    outside_indices = np.nonzero(inside == 0)[0]
     outside_indices = np.reshape(outside_indices, (outside_indices.size, 1))
 
     return bounding_box_indices, outside_indices
+
+
+# function that returns a boolean array which is true for the points of a given point matrix within the convex hull of
+# the vertices, e.g. the points of the vehicle mesh
+def get_convex_hull_mask(vertices, points):
+    # create convex hull and delauney of convex hull vertices
+    hull = ConvexHull(vertices)
+    delaunay = Delaunay(vertices[hull.vertices])
+
+    # find the simplexes, simplex = -1 corresponds to outside of the convex hull
+    return delaunay.find_simplex(points) != -1
+
+
+# function that assigns every point the label of the surrounding area it lies in (see areas in plot_helpers). points
+# outside every area get the label -1. car_bounds are the bounds of the vehicle, grid_bounds the bounds of the
+# environment. the corner areas are angular sections around the corners of the vehicle defined by alpha (front) and beta
+# (rear), near and far areas are separated by dist. points on a border between two areas get the lower label
+def get_area_labels(points, car_bounds, grid_bounds, dist, alpha, beta):
+    x = points[:, 0]
+    y = points[:, 1]
+    inside = get_bounding_box_mask(points, grid_bounds)
+
+    # position of the points relative to the vehicle in x and y direction
+    front = x >= car_bounds[1]
+    rear = x <= car_bounds[0]
+    side = np.logical_and(x >= car_bounds[0], x <= car_bounds[1])
+    left = y >= car_bounds[3]
+    right = y <= car_bounds[2]
+    center = np.logical_and(y >= car_bounds[2], y <= car_bounds[3])
+
+    # cylindrical coordinates of every point relative to the closest corner of the vehicle
+    corners = np.zeros(points.shape)
+    corners[:, 0] = np.where(front, car_bounds[1], car_bounds[0])
+    corners[:, 1] = np.where(left, car_bounds[3], car_bounds[2])
+    vectors = calculate_cyl_from_cart(points - corners)
+    near = vectors[:, 0] <= dist
+    far = vectors[:, 0] >= dist
+    angle = vectors[:, 1]
+
+    # angular sections of the corner boxes, the center sections are added to the center areas
+    front_left = front & left & (angle >= alpha) & (angle <= 90)
+    front_right = front & right & (angle >= -90) & (angle <= -alpha)
+    front_center = (front & left & (angle >= 0) & (angle <= alpha)) | (
+        front & right & (angle >= -alpha) & (angle <= 0)
+    )
+    rear_left = rear & left & (angle >= 90) & (angle <= 180 - beta)
+    rear_right = rear & right & (angle >= -180 + beta) & (angle <= -90)
+    rear_center = (rear & left & (angle >= 180 - beta) & (angle <= 180)) | (
+        rear & right & (angle >= -180) & (angle <= -180 + beta)
+    )
+    near_front = center & (x >= car_bounds[1]) & (x <= car_bounds[1] + dist)
+    far_front = center & (x >= car_bounds[1] + dist)
+    near_rear = center & (x >= car_bounds[0] - dist) & (x <= car_bounds[0])
+    far_rear = center & (x <= car_bounds[0] - dist)
+
+    # the order of the conditions corresponds to the labels, np.select takes the first fulfilled condition
+    conditions = [
+        front_left & far,
+        far_front | (front_center & far),
+        front_right & far,
+        front_left & near,
+        near_front | (front_center & near),
+        front_right & near,
+        side & (y >= car_bounds[3] + dist),
+        side & left & (y <= car_bounds[3] + dist),
+        side & right & (y >= car_bounds[2] - dist),
+        side & (y <= car_bounds[2] - dist),
+        rear_left & near,
+        near_rear | (rear_center & near),
+        rear_right & near,
+        rear_left & far,
+        far_rear | (rear_center & far),
+        rear_right & far,
+    ]
+    labels = np.select(conditions, np.arange(len(conditions)), default=-1)
+    labels[np.invert(inside)] = -1
+
+    return labels.astype(np.int8)
+
+
+# function that combines the coverage of the sensors (rows of coverage) for every point. technologies contains the
+# technology of every sensor (-1 if not registered). the columns of the result are whether any sensor, how many sensors
+# and how many technologies cover a point, then for every technology whether and how many sensors cover a point
+def combine_results(coverage, technologies, n_technologies):
+    combined_results = np.zeros((coverage.shape[1], 3 + 2 * n_technologies), dtype=int)
+
+    # sort the rows by technology, so every technology is a consecutive block of rows
+    technologies = np.asarray(technologies, dtype=int)
+    order = np.argsort(technologies, kind="stable")
+    coverage = coverage[order]
+    technologies = technologies[order]
+
+    # count the covering sensors of every technology with one reduction over the blocks of the stacked results
+    present, starts = np.unique(technologies, return_index=True)
+    if present.size > 0:
+        counts = np.add.reduceat(coverage, starts, axis=0, dtype=int)
+        combined_results[:, 1] = np.sum(counts, axis=0)
+        registered = present >= 0
+        combined_results[:, 3 + n_technologies + present[registered]] = counts[registered].T
+    combined_results[:, 0] = combined_results[:, 1] > 0
+    combined_results[:, 3 : 3 + n_technologies] = combined_results[:, 3 + n_technologies :] > 0
+    combined_results[:, 2] = np.sum(combined_results[:, 3 : 3 + n_technologies], axis=1)
+
+    return combined_results
+
+
+# function that calculates the percentage of counts in sizes rounded to one decimal like the python round function.
+# sizes can be broadcast to the shape of counts, percentages of empty sizes are 0
+def calculate_percentages(counts, sizes):
+    counts, sizes = np.broadcast_arrays(counts, sizes)
+    percentages = np.zeros(counts.shape)
+    valid = sizes > 0
+    percentages[valid] = [
+        round(value, 1) for value in ((counts[valid] / sizes[valid]) * 100).tolist()
+    ]
+
+    return percentages
+
+
+# function that counts the points covered by both rows for every pair of rows of a boolean coverage matrix. the rows
+# are packed into bits, so every pair is counted with an AND and a popcount of the packed bytes using a lookup table
+def count_shared_points(coverage):
+    packed = np.packbits(coverage, axis=1)
+    shared = np.zeros((coverage.shape[0], coverage.shape[0]), dtype=int)
+    for i in range(coverage.shape[0]):
+        shared[i, i:] = np.sum(BIT_COUNTS[packed[i] & packed[i:]], axis=1, dtype=int)
+
+    # the matrix is symmetric, only the upper triangle is counted
+    return shared + np.triu(shared, 1).T
+
+
+# function that calculates the volume of counts cells rounded to two decimals like the python round function
+def calculate_volumes(counts, cell_volume):
+    counts = np.asarray(counts)
+    volumes = [round(value, 2) for value in (counts * cell_volume).ravel().tolist()]
+    return np.reshape(volumes, counts.shape)
+
+
+# function that returns the slice of sorted coordinates between low and high (both included)
+def get_coordinate_range(coordinates, low, high):
+    return slice(np.searchsorted(coordinates, low, side="left"), np.searchsorted(coordinates, high, side="right"))
+
+
+# function that finds the sequences of values 0 next to car values in every row of data at once. the number of zeros
+# then can be directly used to determine the distance to the first covered cell. for the rear/left distance the zeros
+# between the last 1 and the first car value of a row are counted (the whole row without car value), for the
+# front/right distance the zeros between the first car value and the next 1. returns the distances of every row
+def get_blind_distances(data, car_value, cell_length):
+    columns = np.arange(data.shape[1])
+    zeros = data == 0
+    ones = data == 1
+    # a car value of 1 is treated as covered value, so no car is found
+    car = (data == car_value) & (car_value != 1)
+
+    # index of the first car value in every row, the length of the row if there is none
+    first_car = np.amin(np.where(car, columns, data.shape[1]), axis=1, initial=data.shape[1])[:, np.newaxis]
+    # index of the last 1 before and the first 1 after the first car value
+    last_one = np.amax(np.where(ones & (columns < first_car), columns, -1), axis=1, initial=-1)
+    next_one = np.amin(np.where(ones & (columns > first_car), columns, data.shape[1]), axis=1, initial=data.shape[1])
+
+    count_rear = np.sum(zeros & (columns > last_one[:, np.newaxis]) & (columns < first_car), axis=1)
+    count_front = np.sum(zeros & (columns > first_car) & (columns < next_one[:, np.newaxis]), axis=1)
+
+    # save the distances of every row, rounded like the python round function
+    counts = np.column_stack((count_rear, count_front)) * cell_length
+    return np.reshape([round(value, 2) for value in counts.ravel().tolist()], counts.shape)
+
+
+# function that returns for every cell of a structured boolean mask the euclidean distance to the nearest true cell
+# with a distance transform in linear time. the distance is inf for every cell if the mask is empty
+def get_distance_field(mask, spacing):
+    if not np.any(mask):
+        return np.full(mask.shape, np.inf)
+    return ndimage.distance_transform_edt(np.invert(mask), sampling=spacing)
+
+
+# function that returns the parameters t where the lines origins + t * direction cross the planes given by equations
+# [normal, offset] (normal * p + offset = 0). returns an array (lines, planes), nan for lines parallel to a plane
+def get_plane_crossings(origins, direction, equations):
+    rates = equations[:, :3] @ direction
+    values = origins @ equations[:, :3].T + equations[:, 3]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(rates != 0, -values / rates, np.nan)
+
+
+# function that clips the lines origins + t * direction with the convex volume of the half-spaces given by equations
+# [normal, offset] (normal * p + offset <= 0), e.g. the equations of a convex hull. returns the parameters low and high
+# of every line and whether the line crosses the volume
+def get_line_clip(origins, direction, equations):
+    rates = equations[:, :3] @ direction
+    values = origins @ equations[:, :3].T + equations[:, 3]
+    crossings = get_plane_crossings(origins, direction, equations)
+    low = np.amax(np.where(rates < 0, crossings, -np.inf), axis=1, initial=-np.inf)
+    high = np.amin(np.where(rates > 0, crossings, np.inf), axis=1, initial=np.inf)
+    # a line parallel to a plane is outside, if it lies outside of the half-space
+    outside = np.any((rates == 0) & (values > 0), axis=1)
+    return low, high, np.invert(outside) & (low < high)
+
+
+# function that returns the parameters t where the lines origins + t * direction cross the quadric (p - center)^T *
+# matrix * (p - center) = constant, e.g. a sphere or a cone. returns an array (lines, 2), nan if there is no crossing
+def get_quadric_crossings(origins, direction, center, matrix, constant):
+    vectors = origins - center
+    a = direction @ matrix @ direction
+    b = 2 * (vectors @ matrix @ direction)
+    c = np.sum((vectors @ matrix) * vectors, axis=1) - constant
+    crossings = np.full((origins.shape[0], 2), np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if abs(a) < 1e-12:
+            crossings[:, 0] = np.where(b != 0, -c / b, np.nan)
+        else:
+            root = np.sqrt(b**2 - 4 * a * c)
+            crossings[:, 0] = (-b - root) / (2 * a)
+            crossings[:, 1] = (-b + root) / (2 * a)
+    return crossings
+
+
+# function that returns the segments (line, start, end) of the lines origins + t * direction between low and high,
+# whose points fulfill the condition of inside_mask. crossings are the parameters of the borders of the condition on
+# every line (nan for none), so every segment between two sorted crossings is either inside or outside and is
+# classified by its midpoint
+def get_inside_segments(origins, direction, low, high, crossings, inside_mask):
+    low = np.broadcast_to(low, origins.shape[:1])[:, np.newaxis]
+    high = np.broadcast_to(high, origins.shape[:1])[:, np.newaxis]
+    crossings = np.clip(np.where(np.isnan(crossings), low, crossings), low, high)
+    borders = np.sort(np.hstack((low, crossings, high)), axis=1)
+    starts = borders[:, :-1]
+    ends = borders[:, 1:]
+
+    middles = origins[:, np.newaxis] + ((starts + ends) / 2)[:, :, np.newaxis] * direction
+    inside = inside_mask(middles.reshape(-1, 3)).reshape(starts.shape) & (ends > starts)
+    lines = np.nonzero(inside)[0]
+    return lines, starts[inside], ends[inside]
+
+
+# function that returns the intervals (line, start, end) of the lines origins + t * direction, whose points are
+# occluded by the triangles (triangles, 3 vertices, 3) seen from position. the segments from position to the points of
+# a line lie in one plane, which cuts a triangle in a segment. the central projection of this segment from position on
+# the line is the occluded interval of the triangle. only the parts of the segment between position and the line occlude
+def get_shadow_intervals(position, origins, direction, triangles):
+    vectors = origins - position
+    normals_vectors = vectors - np.outer(vectors @ direction, direction)
+    vertices = triangles - position
+    lines, triangle_indices = get_cut_pairs(normals_vectors, direction, vertices)
+
+    # the two points, where the edges of the triangle cross the plane of the line
+    cut = vertices[triangle_indices]
+    distances = np.einsum("nvk,nk->nv", cut, np.cross(direction, normals_vectors[lines]))
+    points = np.zeros((lines.size, 3, 3))
+    crossed = np.zeros((lines.size, 3), dtype=bool)
+    for edge, (i, j) in enumerate(((0, 1), (1, 2), (2, 0))):
+        crossed[:, edge] = (distances[:, i] >= 0) != (distances[:, j] >= 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fraction = np.where(crossed[:, edge], distances[:, i] / (distances[:, i] - distances[:, j]), 0)
+        points[:, edge] = cut[:, i] + fraction[:, np.newaxis] * (cut[:, j] - cut[:, i])
+    pairs = np.arange(lines.size)
+    first = np.argmax(crossed, axis=1)
+    last = 2 - np.argmax(crossed[:, ::-1], axis=1)
+    points = np.stack((points[pairs, first], points[pairs, last]), axis=1)
+
+    # coordinates (u, v) of the points in the plane, a point is position + u * (origin + v / u * direction - position),
+    # so u is the fraction of the way to the line and v / u the parameter on the line
+    scale = np.sum(normals_vectors[lines] ** 2, axis=1)[:, np.newaxis]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        u = np.einsum("npk,nk->np", points, normals_vectors[lines]) / scale
+    v = points @ direction - u * (vectors[lines] @ direction)[:, np.newaxis]
+
+    # clip the segment to 0 < u <= 1, between position and the line the projection is monotone
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bounds = (np.array([1e-9, 1])[np.newaxis] - u[:, :1]) / (u[:, 1:] - u[:, :1])
+    parallel = u[:, 1] == u[:, 0]
+    low = np.where(parallel, 0, np.clip(np.amin(bounds, axis=1), 0, 1))
+    high = np.where(parallel, 1, np.clip(np.amax(bounds, axis=1), 0, 1))
+    valid = np.where(parallel, (u[:, 0] >= 1e-9) & (u[:, 0] <= 1), low < high)
+    ends = np.column_stack((low, high))
+    u_ends = u[:, :1] + ends * (u[:, 1:] - u[:, :1])
+    v_ends = v[:, :1] + ends * (v[:, 1:] - v[:, :1])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        parameters = v_ends / u_ends
+    valid &= np.all(np.isfinite(parameters), axis=1)
+
+    return lines[valid], np.amin(parameters[valid], axis=1), np.amax(parameters[valid], axis=1)
+
+
+# function that returns the pairs (line, triangle) whose triangle is cut by the plane of the line. the planes
+# of all lines contain direction, so every plane is given by its angle around direction between 0 and pi. a vertex
+# changes its side at one angle, so between the sorted angles of its vertices a triangle is either cut or not for all
+# planes and every range of cut angles is a range of the sorted lines
+def get_cut_pairs(normals_vectors, direction, vertices):
+    first_axis = np.cross(direction, np.eye(3)[np.argmin(np.abs(direction))])
+    first_axis /= np.linalg.norm(first_axis)
+    second_axis = np.cross(direction, first_axis)
+
+    line_angles = np.arctan2(normals_vectors @ second_axis, normals_vectors @ first_axis) % np.pi
+    order = np.argsort(line_angles)
+    line_angles = line_angles[order]
+
+    x = vertices @ first_axis
+    y = vertices @ second_axis
+    angles = np.sort(np.arctan2(y, x) % np.pi, axis=1)
+    borders = np.column_stack((np.zeros(angles.shape[0]), angles, np.full(angles.shape[0], np.pi)))
+    middles = (borders[:, :-1] + borders[:, 1:]) / 2
+    sides = np.cos(middles)[:, :, np.newaxis] * y[:, np.newaxis] - np.sin(middles)[:, :, np.newaxis] * x[:, np.newaxis]
+    sides = sides >= 0
+    cut = np.any(sides, axis=2) & np.invert(np.all(sides, axis=2)) & (borders[:, 1:] > borders[:, :-1])
+
+    triangle_indices, segments = np.nonzero(cut)
+    low = np.searchsorted(line_angles, borders[triangle_indices, segments], side="left")
+    high = np.searchsorted(line_angles, borders[triangle_indices, segments + 1], side="left")
+    counts = high - low
+    pairs = np.arange(np.sum(counts)) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(low, counts)
+    return order[pairs], np.repeat(triangle_indices, counts)
+
+
+# function that sweeps over the labeled intervals (line, start, end) of many lines at once. the borders are sorted by
+# line and parameter, every interval adds 1 at its start and removes 1 at its end, so a cumulative sum over all borders
+# counts the intervals of every label that cover the segment after a border. returns the segments (line, start, end)
+# between the borders of every line and their counts (segments, n_labels)
+def sweep_intervals(lines, starts, ends, labels, n_labels):
+    positions = np.concatenate((starts, ends))
+    border_lines = np.concatenate((lines, lines))
+    deltas = np.zeros((positions.size, n_labels), dtype=int)
+    deltas[np.arange(starts.size), labels] = 1
+    deltas[starts.size + np.arange(ends.size), labels] = -1
+
+    order = np.lexsort((positions, border_lines))
+    positions = positions[order]
+    border_lines = border_lines[order]
+    counts = np.cumsum(deltas[order], axis=0)
+
+    valid = (border_lines[:-1] == border_lines[1:]) & (positions[1:] > positions[:-1])
+    return border_lines[:-1][valid], positions[:-1][valid], positions[1:][valid], counts[:-1][valid]
@@ -0,0 +1,69 @@
+import numpy as np
+
+from . import grid_helpers as helpers
+from sensors.sensor import TECHNOLOGIES
+
+
+# this class models a dense 2D lattice on the ground plane around the vehicle (or on a small set of heights). only the
+# points of the lattice are evaluated with the fov and occlusion of the sensors, so memory and runtime scale with the
+# area instead of the volume of the environment. the points are the cell centers of the lattice with x running fastest
+class GroundPlane:
+    def __init__(self, dim_x, dim_y, spacing, center, car, heights=(0.01,), advanced=False):
+        self.spacing = spacing
+        self.car = car
+        self.advanced = advanced
+        self.heights = np.asarray(heights, dtype=float)
+        x = int(dim_x / self.spacing)
+        y = int(dim_y / self.spacing)
+        self.shape = (x, y)
+        # georeferencing of the lattice: lower left corner of the cell (0, 0)
+        self.origin = (center[0] - dim_x / 2, center[1] - dim_y / 2)
+        self.points = np.zeros((x * y, 3))
+        self.points[:, 0] = np.tile(self.origin[0] + (np.arange(x) + 0.5) * self.spacing, y)
+        self.points[:, 1] = np.repeat(self.origin[1] + (np.arange(y) + 0.5) * self.spacing, x)
+
+        # combined data of the sensorset with the shape (heights, y, x, columns) like the cell data of the grid, points
+        # inside the vehicle have the value -1. metrics contains for every height the percentage of points covered by
+        # the sensorset and by every technology, blind_area the area of the points not covered by any sensor
+        self.data = None
+        self.metrics = None
+        self.blind_area = None
+
+    # callable function that computes the coverage of all sensors on every height of the lattice and sets the metrics
+    def calculate_coverage(self, sensors, occlusion_mesh):
+        x, y = self.shape
+        n_technologies = len(TECHNOLOGIES)
+        technologies = [sensor.get_technology() for sensor in sensors]
+        self.data = np.full((self.heights.size, y, x, 3 + 2 * n_technologies), -1)
+
+        for k, height in enumerate(self.heights):
+            points = self.points.copy()
+            points[:, 2] = height
+
+            # remove the points inside the vehicle, the bounding box (mode normal) or the convex hull (mode advanced)
+            inside = helpers.get_bounding_box_mask(points, self.car.bounds)
+            if self.advanced:
+                inside[inside] = helpers.get_convex_hull_mask(self.car.points, points[inside])
+            calc_points = points[np.invert(inside)]
+
+            # the sensors are evaluated with the same fov and occlusion as on the grid
+            coverage = np.zeros((len(sensors), calc_points.shape[0]), dtype=bool)
+            for i, sensor in enumerate(sensors):
+                coverage[i] = sensor.get_point_coverage(calc_points, occlusion_mesh)
+            data = self.data[k].reshape(x * y, -1)
+            data[np.invert(inside)] = helpers.combine_results(coverage, technologies, n_technologies)
+
+        self.__set_metrics()
+
+    # private function that sets the metrics of every height
+    def __set_metrics(self):
+        n_technologies = len(TECHNOLOGIES)
+        data = self.data.reshape(self.heights.size, -1, self.data.shape[3])
+        calc = data[:, :, 0] >= 0
+        columns = np.append(0, np.arange(3, 3 + n_technologies))
+
+        counts = np.sum(data[:, :, columns] == 1, axis=1)
+        self.metrics = helpers.calculate_percentages(counts, np.sum(calc, axis=1)[:, np.newaxis])
+        self.blind_area = np.array(
+            [round(cells * self.spacing**2, 2) for cells in np.sum(data[:, :, 0] == 0, axis=1).tolist()]
+        )
@@ -0,0 +1,191 @@
+import copy
+
+import numpy as np
+import yaml
+from easydict import EasyDict as edict
+from scipy.spatial import cKDTree
+
+from . import grid_helpers as helpers
+from .stencil import StencilCache
+from .visibility import VisibilityCache
+from plotting.plot_helpers import areas
+from sensors.sensor_helpers import SENSOR_GROUPS, create_sensorset
+
+# this file contains the functions to load the candidates of a sensor placement and the greedy placement optimizer. a
+# candidate is a sensor type of the catalog on a mount point with an orientation. the mount points are given in the
+# yaml file or sampled on the surface of the vehicle. with grid_aligned the mount points are moved to points of the
+# grid, so the fov of the candidates is shifted from cached stencils (see stencil.py) instead of computed for every
+# candidate
+
+
+def load_candidates(yaml_file, vehicle, grid=None):
+    with open(yaml_file, "r") as file:
+        definition = yaml.safe_load(file)
+    grid_aligned = definition.get("grid_aligned", False)
+    if grid_aligned and grid is None:
+        raise ValueError("Grid-aligned candidates need a grid")
+
+    # mount points with their orientations, the yaw of sampled mount points is relative to the normal of the surface
+    default_orientations = definition.get("orientations", [dict(pitch=0, yaw=0, roll=0)])
+    mounts = []
+    for mount in definition.get("mounts", []):
+        position = [mount["position"]["x"], mount["position"]["y"], mount["position"]["z"]]
+        mounts.append((position, 0, mount.get("orientations", default_orientations)))
+    if "surface" in definition:
+        surface = definition["surface"]
+        positions, yaws = get_surface_mounts(
+            vehicle, surface["number"], surface.get("min_height", 0), surface.get("offset", 0.05)
+        )
+        for position, yaw in zip(positions.tolist(), yaws.tolist()):
+            mounts.append((position, yaw, surface.get("orientations", default_orientations)))
+    if grid_aligned:
+        positions = get_grid_mounts(grid, vehicle, [position for position, _, _ in mounts])
+        mounts = [(position, yaw, orientations) for position, (_, yaw, orientations) in zip(positions.tolist(), mounts)]
+
+    # every sensor type of the catalog on every mount point with every orientation is a candidate
+    sensorset = {group: [] for group in SENSOR_GROUPS}
+    costs = []
+    mount_indices = []
+    for group in SENSOR_GROUPS:
+        for sensor_type in definition["catalog"].get(group, []):
+            for mount, (position, yaw, orientations) in enumerate(mounts):
+                for orientation in orientations:
+                    candidate = {key: copy.deepcopy(value) for key, value in sensor_type.items() if key != "cost"}
+                    candidate["orientation"] = dict(
+                        pitch=float(orientation["pitch"]),
+                        yaw=round(float(orientation["yaw"] + yaw), 2),
+                        roll=float(orientation["roll"]),
+                    )
+                    candidate["position"] = dict(zip("xyz", [round(float(value), 3) for value in position]))
+                    candidate["name"] = (
+                        f"{sensor_type['name']} mount {mount} pitch {candidate['orientation']['pitch']} "
+                        f"yaw {candidate['orientation']['yaw']}"
+                    )
+                    sensorset[group].append(candidate)
+                    costs.append(sensor_type.get("cost", 1))
+                    mount_indices.append(mount)
+
+    definitions = [(group, candidate) for group in SENSOR_GROUPS for candidate in sensorset[group]]
+    return edict(
+        sensors=create_sensorset(sensorset),
+        definitions=definitions,
+        costs=np.array(costs, dtype=float),
+        mounts=np.array(mount_indices, dtype=int),
+        budget=definition["budget"],
+        weights=definition.get("weights", {}),
+        grid_aligned=grid_aligned,
+    )
+
+
+# function that samples mount points on the surface of the vehicle above min_height. the points are cell centers of
+# the vehicle mesh spread by farthest point sampling, moved by offset along the normal of the surface, so the sensors
+# are not occluded by their own mount. returns the positions and the yaw angles of the normals
+def get_surface_mounts(vehicle, number, min_height=0, offset=0.05):
+    centers = vehicle.cell_centers().points
+    normals = np.array(vehicle.cell_normals)
+
+    # the normals are oriented away from the center of the vehicle
+    outward = np.sum((centers - np.array(vehicle.center)) * normals, axis=1) >= 0
+    normals[np.invert(outward)] *= -1
+
+    # farthest point sampling starting at the highest point
+    valid = np.nonzero(centers[:, 2] >= min_height)[0]
+    selected = [valid[np.argmax(centers[valid, 2])]]
+    distances = np.linalg.norm(centers[valid] - centers[selected[0]], axis=1)
+    for _ in range(min(number, valid.size) - 1):
+        selected.append(valid[np.argmax(distances)])
+        distances = np.minimum(distances, np.linalg.norm(centers[valid] - centers[selected[-1]], axis=1))
+
+    positions = centers[selected] + offset * normals[selected]
+    yaws = np.degrees(np.arctan2(normals[selected, 1], normals[selected, 0]))
+    return positions, yaws
+
+
+# function that moves the mount points to the nearest points of the grid outside of the convex hull of the vehicle, so
+# the sensors are not inside the vehicle and their positions differ by whole grid cells
+def get_grid_mounts(grid, vehicle, positions):
+    valid = np.invert(helpers.get_convex_hull_mask(vehicle.points, grid.points))
+    points = grid.points[valid]
+    return points[cKDTree(points).query(np.asarray(positions, dtype=float))[1]]
+
+
+# this class selects candidates greedily until the budget is spent. every step selects the candidate with the largest
+# gain of weighted covered volume per cost, the weights belong to the areas (see plot_helpers.areas, total is the
+# weight of all other points). every mount point is used once. the coverage of every candidate on the calc_points of
+# the grid is computed once and packed into bits grouped by area, every area starts at a full byte, so every byte has
+# the weight of one area. the gains of all candidates are then computed at once with an AND NOT and a popcount.
+# grid-aligned candidates take their fov from the stencil cache, the candidates on the same mount point share the
+# visibility of the points, so every point is ray traced once per mount point
+class PlacementOptimizer:
+    def __init__(self, grid, candidates):
+        self.grid = grid
+        self.candidates = candidates
+        self.selected = []
+        self.gains = []
+        self.coverage = []
+        self.__packed = None
+        self.__byte_weights = None
+
+        if np.any(self.candidates.costs <= 0):
+            raise ValueError("The costs of all candidates have to be positive")
+
+        # call function to set the bitsets of the candidates
+        self.__set_bitsets()
+
+    # private function that computes the coverage of every candidate and packs it into bits grouped by area
+    def __set_bitsets(self):
+        labels = self.grid.calc_area_label
+        names = {index: name for name, index in areas.items()}
+        default = self.candidates.weights.get("total", 1)
+
+        positions = np.zeros(labels.size, dtype=int)
+        byte_weights = []
+        start = 0
+        for label in np.unique(labels).tolist():
+            indices = np.nonzero(labels == label)[0]
+            positions[indices] = start + np.arange(indices.size)
+            n_bytes = -(-indices.size // 8)
+            byte_weights.append(np.full(n_bytes, self.candidates.weights.get(names.get(label), default), dtype=float))
+            start += 8 * n_bytes
+
+        bits = np.zeros((len(self.candidates.sensors), start), dtype=bool)
+        stencils = None
+        if self.candidates.get("grid_aligned", False):
+            stencils = StencilCache(self.grid, self.candidates.sensors)
+        visibility = VisibilityCache(self.grid.calc_points, self.grid.car)
+        for i, sensor in enumerate(self.candidates.sensors):
+            fov = None if stencils is None else stencils.get_fov_mask(sensor)
+            bits[i, positions] = visibility.get_point_coverage(sensor, fov)
+        self.__packed = np.packbits(bits, axis=1)
+        self.__byte_weights = np.concatenate(byte_weights + [np.zeros(0)])
+
+    # callable function that selects the candidates greedily within the budget. sets the selected candidates, the gain
+    # of weighted volume of every step and the percentage of calc_points covered after every step
+    def optimize(self, budget=None):
+        budget = self.candidates.budget if budget is None else budget
+        cell_volume = self.grid.spacing**3
+        covered = np.zeros(self.__packed.shape[1], dtype=np.uint8)
+        available = np.ones(len(self.candidates.sensors), dtype=bool)
+        self.selected = []
+        self.gains = []
+        self.coverage = []
+
+        while True:
+            available &= self.candidates.costs <= budget
+            indices = np.nonzero(available)[0]
+            if indices.size == 0:
+                break
+            gains = helpers.BIT_COUNTS[self.__packed[indices] & np.invert(covered)] @ self.__byte_weights
+            best = np.argmax(gains / self.candidates.costs[indices])
+            if gains[best] <= 0:
+                break
+
+            candidate = indices[best]
+            covered |= self.__packed[candidate]
+            budget -= self.candidates.costs[candidate]
+            available[self.candidates.mounts == self.candidates.mounts[candidate]] = False
+            self.selected.append(int(candidate))
+            self.gains.append(round(float(gains[best]) * cell_volume, 2))
+            self.coverage.append(
+                round(100 * int(np.sum(helpers.BIT_COUNTS[covered], dtype=int)) / self.grid.calc_points.shape[0], 1)
+            )
@@ -0,0 +1,56 @@
+import numpy as np
+
+from . import grid_helpers as helpers
+
+
+# this class computes the blind area and the blind distances of every z-level of the grid in one pass over the
+# structured cell data. the values of a level are the same as the ones of a z-slice through the cells of the level
+class BlindProfile:
+    def __init__(self, grid):
+        self.grid = grid
+        self.cell_area = grid.spacing**2
+        self.z = None
+        self.blind_area = None
+        self.x_max_rear = None
+        self.x_max_front = None
+        self.y_max_right = None
+        self.y_max_left = None
+
+        # call function to set the metrics
+        self.__set_metrics()
+
+    # private function that sets the metrics of all levels
+    def __set_metrics(self):
+        volume, coordinates = self.grid.get_volume_view()
+        data = volume[:, :, :, 0]
+        self.z = coordinates["z"]
+
+        # compute blind area of every level
+        blind_cells = np.count_nonzero(data == 0, axis=(1, 2))
+        self.blind_area = np.array([round(self.cell_area * cells, 2) for cells in blind_cells.tolist()])
+
+        # compute the distances to the first covered cell in direction of global coordinate axis for the levels within
+        # the height of the car, like in the slices an area of the 4x length/width of the car is examined
+        bounds = np.reshape(self.grid.car.bounds, (3, 2))
+        levels = helpers.get_coordinate_range(self.z, bounds[2, 0], bounds[2, 1])
+        range_x = helpers.get_coordinate_range(coordinates["x"], bounds[0, 0], bounds[0, 1])
+        range_y = helpers.get_coordinate_range(coordinates["y"], bounds[1, 0], bounds[1, 1])
+        range_x_4 = helpers.get_coordinate_range(coordinates["x"], bounds[0, 0] * 4, bounds[0, 1] * 4)
+        range_y_4 = helpers.get_coordinate_range(coordinates["y"], bounds[1, 0] * 4, bounds[1, 1] * 4)
+
+        # the rows of all levels are stacked, so the distances of the whole volume are computed at once
+        x_dist = self.__get_max_distances(data[levels, range_y, range_x_4], levels)
+        y_dist = self.__get_max_distances(np.swapaxes(data[levels, range_y_4, range_x], 1, 2), levels)
+        self.x_max_rear, self.x_max_front = x_dist.T
+        self.y_max_right, self.y_max_left = y_dist.T
+
+    # private function that returns the maximum distances (rear/left, front/right) of every level for the data of the
+    # examined area with the shape (levels, rows, columns). levels outside the examined area have the distance 0
+    def __get_max_distances(self, data, levels):
+        distances = helpers.get_blind_distances(
+            data.reshape(-1, data.shape[2]), self.grid.car_value, np.sqrt(self.cell_area)
+        )
+        distances = distances.reshape(data.shape[0], data.shape[1], 2)
+        result = np.zeros((self.z.size, 2))
+        result[levels] = np.amax(distances, axis=1, initial=0)
+        return result
@@ -0,0 +1,103 @@
+import numpy as np
+
+from . import grid_helpers as helpers
+from .grid import get_column_conditions
+from .slice import Slice
+from plotting.plot_helpers import areas, metrics
+
+
+# this class evaluates the results of a grid with combined data on demand. every metric, area and slice is computed
+# on first access and then memoized, so a caller that only needs a few outputs (e.g. an optimization loop) does not pay
+# for the rest. conditions contains the minimum values of the count metrics, e.g. {"N1": 3, "N2": 2}, named like in
+# grid.get_count_columns
+class Results:
+    def __init__(self, grid, conditions=None):
+        self.grid = grid
+        self.conditions = conditions if conditions is not None else {}
+        self.__metrics = {}
+        self.__slices = {}
+        self.__zone_metrics = None
+        self.__blind_spot_volume = None
+
+    # volume of the cells that are not covered by any sensor
+    @property
+    def blind_spot_volume(self):
+        if self.__blind_spot_volume is None:
+            blind_cells = np.count_nonzero(self.grid.mesh.cell_data["sensorset"][:, 0] == 0)
+            self.__blind_spot_volume = round(blind_cells * self.grid.mesh.spacing[0] ** 3, 2)
+        return self.__blind_spot_volume
+
+    # callable function that returns the percentage of points of an area fulfilling a metric. area and metric can be
+    # passed as names (see plot_helpers) or indices
+    def get_metric(self, area, metric):
+        area = areas.get(area, area)
+        metric = metrics.get(metric, metric)
+        if (area, metric) not in self.__metrics:
+            # the metric is read from the histograms of the grid, the cell data is not used
+            lower, upper = self.__get_condition(metric)
+            count = np.sum(self.grid.histograms[area, metric, lower : upper + 1])
+            percentage = helpers.calculate_percentages(count, self.grid.area_sizes[area])
+            self.__metrics[(area, metric)] = percentage.item()
+        return self.__metrics[(area, metric)]
+
+    # callable function that returns the percentage of points of a user defined zone of the grid fulfilling a metric.
+    # the metrics of all zones are computed together on first access
+    def get_zone_metric(self, zone, metric):
+        metric = metrics.get(metric, metric)
+        if self.__zone_metrics is None:
+            conditions = [self.__get_condition(column) for column in range(self.grid.histograms.shape[1])]
+            lower, upper = np.array(conditions).T
+            self.__zone_metrics = self.grid.compute_zone_metrics(lower, upper)
+        return self.__zone_metrics[self.grid.zone_names.index(zone), metric].item()
+
+    # callable function that returns all metrics of an area as a dictionary with the metric names as keys
+    def get_area(self, area):
+        return {name: self.get_metric(area, metric) for name, metric in metrics.items()}
+
+    # callable function that returns the metrics matrix of all areas (rows) and metrics (columns)
+    def get_matrix(self):
+        matrix = np.zeros((len(areas), len(metrics)))
+        for area in areas.values():
+            for metric in metrics.values():
+                matrix[area, metric] = self.get_metric(area, metric)
+        return matrix
+
+    # callable function that returns the slice of the grid at dist with the given normal
+    def get_slice(self, dist, normal="z"):
+        if (normal, dist) not in self.__slices:
+            self.__slices[(normal, dist)] = Slice(self.grid, dist, normal=normal)
+        return self.__slices[(normal, dist)]
+
+    # callable function that evaluates a list of requested outputs and returns them as a dictionary. an output is
+    # either "blind_spot_volume", "<area>:<metric>" (e.g. "total:total_coverage"), "<zone>:<metric>" for a user defined
+    # zone or "<normal>=<dist>:<attribute>" for an attribute of a slice (e.g. "z=0.8:blind_area"). an unknown output
+    # raises a ValueError
+    def evaluate(self, outputs):
+        values = {}
+        for output in outputs:
+            if output == "blind_spot_volume":
+                values[output] = self.blind_spot_volume
+                continue
+
+            name, separator, attribute = output.partition(":")
+            if separator and "=" in name:
+                normal, dist = name.split("=")
+                cross_section = self.get_slice(float(dist), normal=normal)
+                # only the public attributes of the slice are outputs
+                if attribute.startswith("_") or not hasattr(cross_section, attribute):
+                    raise ValueError(f"Unknown output {output}")
+                values[output] = getattr(cross_section, attribute)
+            elif name in areas and attribute in metrics:
+                values[output] = self.get_metric(name, attribute)
+            elif name in self.grid.zone_names and attribute in metrics:
+                values[output] = self.get_zone_metric(name, attribute)
+            else:
+                raise ValueError(f"Unknown output {output}")
+
+        return values
+
+    # private function that returns the lowest and highest value of a column fulfilling its metric, see
+    # grid.get_column_conditions
+    def __get_condition(self, metric):
+        lower, upper = get_column_conditions(self.grid.histograms.shape[1], self.grid.car_value, self.conditions)
+        return int(lower[metric]), int(upper[metric])
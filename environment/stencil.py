@@ -0,0 +1,106 @@
+import numpy as np
+
+# this file contains the fov stencils of the sensors. without occlusion, moving a sensor by a whole number of grid cells
+# only shifts its fov on the grid, so the fov of a sensor type with an orientation is computed once as offsets of the
+# covered points to the cell of the sensor (stencil). the fov at any grid-aligned mount point is then an index shift of
+# the stencil, only the occlusion is computed for every mount point
+
+# function that returns the position of a point in units of the grid spacing relative to the first point of the grid,
+# rounded so positions that differ by whole grid cells have the same fraction
+def get_lattice_position(grid, position):
+    return np.round((np.asarray(position, dtype=float) - grid.points[0]) / grid.spacing, 6)
+
+
+# function that returns the cell of a position, i.e. the grid point at or below the position in every direction
+def get_cell(grid, position):
+    return np.floor(get_lattice_position(grid, position)).astype(int)
+
+
+# function that returns the lowest and highest offsets from the cells to the points of the grid in every direction
+def get_offset_bounds(grid, cells):
+    return -np.amax(cells, axis=0), np.array(grid.shape) - 1 - np.amin(cells, axis=0)
+
+
+# this class contains the stencil of one sensor on the grid for the mount points in cells. the stencil covers all
+# offsets from these cells to the points of the grid
+class FovStencil:
+    def __init__(self, grid, sensor, cells):
+        self.grid = grid
+        self.cell = get_cell(grid, sensor.position)
+        self.low, self.high = get_offset_bounds(grid, cells)
+        self.offsets = None
+
+        # call function to set the offsets of the covered points
+        self.__set_offsets(sensor)
+
+    # private function that evaluates the fov of the sensor on all offsets. the offsets are evaluated in slabs of
+    # constant z offset to limit the memory
+    def __set_offsets(self, sensor):
+        x, y = np.meshgrid(np.arange(self.low[0], self.high[0] + 1), np.arange(self.low[1], self.high[1] + 1))
+        offsets = []
+        for z in range(self.low[2], self.high[2] + 1):
+            slab = np.column_stack((x.ravel(), y.ravel(), np.full(x.size, z)))
+            points = self.grid.points[0] + (self.cell + slab) * self.grid.spacing
+            offsets.append(slab[sensor.get_fov_mask(points)])
+        self.offsets = np.concatenate(offsets).astype(np.int32)
+
+    # callable function that returns the indices of the grid points in the fov of the stencil shifted to the cell of
+    # position. returns None if the stencil does not cover the grid from this cell
+    def get_point_indices(self, position):
+        shape = np.array(self.grid.shape)
+        cell = get_cell(self.grid, position)
+        if np.any(-cell < self.low) or np.any(shape - 1 - cell > self.high):
+            return None
+
+        cells = cell + self.offsets
+        cells = cells[np.all((cells >= 0) & (cells < shape), axis=1)]
+        return cells[:, 0] + shape[0] * (cells[:, 1] + shape[1] * cells[:, 2])
+
+
+# this class contains the stencils of a list of sensors on a grid. sensors share a stencil, if they have the same type,
+# fov, orientation and position within their cell, i.e. their positions differ by whole grid cells. a stencil spans
+# the offsets of all its mount points (up to twice the grid per direction) and needs one fov test per offset, while the
+# direct computation needs one fov test per calc_point and sensor. so a stencil is only created for a group of sensors
+# inside the grid with fewer offsets than fov tests of the direct computation, all other sensors are computed directly
+class StencilCache:
+    def __init__(self, grid, sensors):
+        self.grid = grid
+        self.stencils = {}
+        # index of every grid point in the calc_points, -1 for the removed points
+        self.__calc_indices = np.full(grid.points.shape[0], -1)
+        self.__calc_indices[grid.outside_indices.ravel()] = np.arange(grid.calc_points.shape[0])
+
+        # call function to create the stencils of the sensors
+        self.__set_stencils(sensors)
+
+    # private function that returns the key of the stencil of a sensor
+    def __get_key(self, sensor):
+        position = get_lattice_position(self.grid, sensor.position)
+        values = np.concatenate((sensor.fov_parameters(), sensor.coordinate_system.ravel(), position % 1))
+        return (type(sensor).__name__,) + tuple(np.round(values, 6).tolist())
+
+    # private function that groups the sensors inside the grid by key and creates the stencils of the groups
+    def __set_stencils(self, sensors):
+        groups = {}
+        for sensor in sensors:
+            cell = get_cell(self.grid, sensor.position)
+            if np.all(cell >= 0) and np.all(cell < np.array(self.grid.shape)):
+                groups.setdefault(self.__get_key(sensor), []).append((sensor, cell))
+        for key, group in groups.items():
+            cells = np.array([cell for _, cell in group])
+            low, high = get_offset_bounds(self.grid, cells)
+            if np.prod(high - low + 1) < len(group) * self.grid.calc_points.shape[0]:
+                self.stencils[key] = FovStencil(self.grid, group[0][0], cells)
+
+    # callable function that returns the fov of the sensor as boolean array over the calc_points of the grid, shifted
+    # from the stencil of the sensor. returns None if there is no stencil for the sensor
+    def get_fov_mask(self, sensor):
+        stencil = self.stencils.get(self.__get_key(sensor))
+        point_indices = None if stencil is None else stencil.get_point_indices(sensor.position)
+        if point_indices is None:
+            return None
+
+        calc_indices = self.__calc_indices[point_indices]
+        result = np.zeros(self.grid.calc_points.shape[0], dtype=bool)
+        result[calc_indices[calc_indices >= 0]] = True
+        return result
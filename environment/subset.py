@@ -0,0 +1,157 @@
+import itertools
+import logging
+
+import numpy as np
+import yaml
+from easydict import EasyDict as edict
+
+from . import grid_helpers as helpers
+from plotting.plot_helpers import areas
+
+# this file contains the function to load the coverage targets of a subset selection and the selection of the smallest
+# (or cheapest) subset of a sensorset that meets the targets. a target requires a percentage of the points of an area
+# or a zone to be covered by at least n_sensors sensors
+
+
+def load_targets(yaml_file):
+    with open(yaml_file, "r") as file:
+        yaml_targets = yaml.safe_load(file)
+    target_definition = edict(yaml_targets)
+
+    for target in target_definition.targets:
+        target.n_sensors = target.get("n_sensors", 1)
+        target.coverage = target.get("coverage", 100)
+    target_definition.costs = target_definition.get("costs", {})
+    target_definition.local_search = target_definition.get("local_search", True)
+    return target_definition
+
+
+# this class selects a subset of the sensors that meets the targets as set cover. the coverage of every sensor and the
+# points of every target are packed into bits. the points covered by at least k sensors of a subset are accumulated
+# like a counter over the packed bits (at_least[k] |= at_least[k - 1] & sensor), so a subset is checked with a few bit
+# operations and a popcount. starting with all sensors, the most expensive sensor whose removal keeps the targets met
+# is dropped greedily. the local search then replaces one or two selected sensors by a cheaper unselected one. targets
+# that the whole sensorset does not meet are infeasible, for them the subset has to keep the coverage of the whole
+# sensorset (best possible) and a warning is logged
+class SubsetSelection:
+    def __init__(self, grid, sensors, targets):
+        self.grid = grid
+        self.sensors = sensors
+        self.targets = targets.targets
+        self.local_search = targets.local_search
+        self.costs = np.array([targets.costs.get(sensor.name, 1) for sensor in sensors], dtype=float)
+        self.selected = []
+        self.dropped = []
+        self.required = None
+        self.infeasible = None
+        self.full_coverage = None
+        self.coverage = None
+        self.__packed = None
+        self.__target_masks = None
+        self.__target_sizes = None
+        self.__limits = None
+        self.__n_sensors = np.array([target.n_sensors for target in self.targets], dtype=int)
+
+        # call function to set the bitsets of the sensors and targets
+        self.__set_bitsets()
+
+    # private function that packs the coverage of the sensors and the points of the targets into bits
+    def __set_bitsets(self):
+        coverage = np.zeros((len(self.sensors), self.grid.calc_points.shape[0]), dtype=bool)
+        for i, sensor in enumerate(self.sensors):
+            coverage[i] = sensor.calculation_result
+        masks = np.zeros((len(self.targets), self.grid.calc_points.shape[0]), dtype=bool)
+        for i, target in enumerate(self.targets):
+            masks[i] = self.__get_target_mask(target)
+
+        self.__packed = np.packbits(coverage, axis=1)
+        self.__target_masks = np.packbits(masks, axis=1)
+        self.__target_sizes = np.sum(masks, axis=1)
+
+    # private function that returns the calc_points of a target, its area is the name of an area or a zone
+    def __get_target_mask(self, target):
+        if target.area in areas:
+            if areas[target.area] == 17:
+                return np.ones(self.grid.calc_points.shape[0], dtype=bool)
+            return self.grid.calc_area_label == areas[target.area]
+        if target.area in self.grid.zone_names:
+            return self.grid.zone_masks[self.grid.zone_names.index(target.area)]
+        raise ValueError(f"Unknown area or zone {target.area}")
+
+    # private function that returns the number of points of every target covered by at least n_sensors of the subset
+    def __count_points(self, subset):
+        at_least = np.zeros((np.amax(self.__n_sensors, initial=1), self.__packed.shape[1]), dtype=np.uint8)
+        for i in subset:
+            for k in range(at_least.shape[0] - 1, 0, -1):
+                at_least[k] |= at_least[k - 1] & self.__packed[i]
+            at_least[0] |= self.__packed[i]
+        fulfilled = at_least[np.maximum(self.__n_sensors - 1, 0)] & self.__target_masks
+        return np.sum(helpers.BIT_COUNTS[fulfilled], axis=1, dtype=int)
+
+    # private function that checks whether a subset meets all targets
+    def __is_feasible(self, subset):
+        return bool(np.all(self.__count_points(subset) >= self.__limits))
+
+    # callable function that selects the subset. sets the selected and dropped sensors, the required number of points
+    # of every target, whether a target is infeasible and the coverage (%) of the targets by the whole sensorset and by
+    # the subset
+    def select(self):
+        every_sensor = list(range(len(self.sensors)))
+        full_counts = self.__count_points(every_sensor)
+        required = np.ceil(np.array([target.coverage for target in self.targets]) / 100 * self.__target_sizes)
+        self.required = required.astype(int)
+        self.infeasible = self.required > full_counts
+        self.__limits = np.minimum(self.required, full_counts)
+
+        selected = self.__drop_sensors(every_sensor)
+        if self.local_search:
+            selected = self.__improve(selected)
+
+        self.selected = sorted(selected)
+        self.dropped = [i for i in every_sensor if i not in selected]
+        self.full_coverage = helpers.calculate_percentages(full_counts, self.__target_sizes)
+        self.coverage = helpers.calculate_percentages(self.__count_points(self.selected), self.__target_sizes)
+        for i in np.nonzero(self.infeasible)[0].tolist():
+            target = self.targets[i]
+            logging.warning(
+                f"Target {target.area} ({target.coverage} % by {target.n_sensors} sensors) is not met by the whole "
+                f"sensorset ({self.full_coverage[i]} %), the subset keeps the best possible coverage"
+            )
+
+    # private function that drops the most expensive sensor whose removal keeps the targets met until no sensor can be
+    # dropped. sensors with the same cost are dropped in the order of the smallest loss of fulfilled points
+    def __drop_sensors(self, subset):
+        subset = list(subset)
+        while True:
+            counts = self.__count_points(subset)
+            candidates = []
+            for i in subset:
+                remaining = [j for j in subset if j != i]
+                reduced = self.__count_points(remaining)
+                if np.all(reduced >= self.__limits):
+                    candidates.append((-self.costs[i], int(np.sum(counts - reduced)), i))
+            if not candidates:
+                return subset
+            subset.remove(min(candidates)[2])
+
+    # private function that replaces one or two selected sensors by a cheaper unselected sensor as long as the total
+    # cost decreases, after every replacement the sensors are dropped again
+    def __improve(self, subset):
+        replacement = self.__find_replacement(subset)
+        while replacement is not None:
+            subset = self.__drop_sensors(replacement)
+            replacement = self.__find_replacement(subset)
+        return subset
+
+    # private function that returns the first subset with one or two selected sensors replaced by a cheaper unselected
+    # sensor that meets the targets, None if there is none
+    def __find_replacement(self, subset):
+        unselected = [i for i in range(len(self.sensors)) if i not in subset]
+        for size in (2, 1):
+            for removed in itertools.combinations(subset, size):
+                for added in unselected:
+                    if self.costs[added] < np.sum(self.costs[list(removed)]):
+                        candidate = [i for i in subset if i not in removed] + [added]
+                        if self.__is_feasible(candidate):
+                            return candidate
+        return None
@@ -0,0 +1,196 @@
+import copy
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import yaml
+from easydict import EasyDict as edict
+
+from .visibility import VisibilityCache
+from sensors.sensor_helpers import create_sensorset, load_sensor_definitions
+
+# this file contains the monte carlo analysis of the mounting tolerances of a sensorset. every sample deviates the
+# position and the orientation of the sensors randomly from the poses of the sensorset, the metrics of the grid are
+# evaluated for every sample and accumulated online to mean, standard deviation and worst case
+
+# axes of the deviations of the position and the orientation
+POSITION_AXES = ("x", "y", "z")
+ORIENTATION_AXES = ("pitch", "yaw", "roll")
+
+# state of a worker process: the grid, the nominal sensors, the sensors with only an orientation tolerance, their
+# visibility cache (None without such sensors) and the conditions of the metrics
+WORKER_STATE = {}
+
+
+def load_tolerances(yaml_file):
+    with open(yaml_file, "r") as file:
+        yaml_tolerances = yaml.safe_load(file)
+    tolerance_definition = edict(yaml_tolerances)
+
+    tolerance_definition.samples = tolerance_definition.get("samples", 100)
+    tolerance_definition.seed = tolerance_definition.get("seed", None)
+    tolerance_definition.workers = tolerance_definition.get("workers", 1)
+    tolerance_definition.default = tolerance_definition.get("default", {})
+    tolerance_definition.sensors = tolerance_definition.get("sensors", {})
+    for tolerance in [tolerance_definition.default] + list(tolerance_definition.sensors.values()):
+        distribution = tolerance.get("distribution", "normal")
+        if distribution not in ("normal", "uniform"):
+            raise ValueError(f"Unknown tolerance distribution {distribution}")
+    return tolerance_definition
+
+
+# function that returns the tolerance of every axis, the tolerance is given for all axes or per axis
+def get_axis_tolerances(tolerance, axes):
+    if isinstance(tolerance, dict):
+        return np.array([tolerance.get(axis, 0) for axis in axes], dtype=float)
+    return np.full(len(axes), tolerance, dtype=float)
+
+
+# function that draws the deviations of the axes. the tolerance is the standard deviation (normal) or the maximum
+# deviation (uniform)
+def draw_deviations(rng, tolerances, distribution):
+    if distribution == "uniform":
+        return rng.uniform(-tolerances, tolerances)
+    return rng.normal(0, tolerances)
+
+
+# function that sets the state of a worker process, it is called once per process. the visibility cache is only kept
+# if a sensor has no position tolerance, otherwise every sample is ray traced and the cache would never be hit
+def init_worker(grid, sensors, fixed_positions, conditions):
+    WORKER_STATE.update(
+        grid=grid,
+        sensors=sensors,
+        fixed_positions=fixed_positions,
+        visibility=VisibilityCache(grid.calc_points, grid.car) if fixed_positions else None,
+        conditions=conditions,
+    )
+
+
+# function that computes the metrics of the grid for a sample. a sample contains for every sensor None (no deviation,
+# the nominal coverage is used) or the group and the deviated definition of the sensor. sensors with an unchanged
+# position only need the fov test, the occlusion is taken from the visibility cache of the worker
+def evaluate_sample(sample):
+    grid = WORKER_STATE["grid"]
+    sensors = []
+    for i, entry in enumerate(sample):
+        if entry is None:
+            sensors.append(WORKER_STATE["sensors"][i])
+            continue
+        sensor = create_sensorset({entry[0]: [entry[1]]})[0]
+        if i in WORKER_STATE["fixed_positions"]:
+            sensor.calculation_result = WORKER_STATE["visibility"].get_point_coverage(sensor)
+        else:
+            sensor.calculate_points(grid.calc_points, grid.car)
+        sensors.append(sensor)
+
+    grid.combine_data(sensors)
+    grid.set_metrics_no_condition()
+    grid.set_metrics_condition(**WORKER_STATE["conditions"])
+    return np.array(grid.metrics)
+
+
+# this class accumulates the mean, the standard deviation, the minimum and the maximum of samples of an array online
+# with the algorithm of welford, so the memory does not grow with the number of samples
+class OnlineStatistics:
+    def __init__(self, shape):
+        self.count = 0
+        self.mean = np.zeros(shape)
+        self.minimum = np.full(shape, np.inf)
+        self.maximum = np.full(shape, -np.inf)
+        self.__m2 = np.zeros(shape)
+
+    # callable function that adds a sample
+    def update(self, values):
+        self.count += 1
+        delta = values - self.mean
+        self.mean += delta / self.count
+        self.__m2 += delta * (values - self.mean)
+        self.minimum = np.minimum(self.minimum, values)
+        self.maximum = np.maximum(self.maximum, values)
+
+    # sample standard deviation, 0 for less than two samples
+    @property
+    def std(self):
+        if self.count < 2:
+            return np.zeros_like(self.mean)
+        return np.sqrt(self.__m2 / (self.count - 1))
+
+
+# this class evaluates the metrics of the grid for samples of the sensorset with random mounting tolerances. the
+# tolerances of a sensor are given by its name, otherwise the default is used. sensors without tolerance keep their
+# nominal coverage, sensors with only an orientation tolerance keep their position, so the visibility (occlusion) of
+# a point is ray traced once per worker. the samples are evaluated in parallel by workers processes. the metrics of the
+# grid have to be set before, they are the nominal metrics. the worst case of a metric is its minimum
+class ToleranceAnalysis:
+    def __init__(self, grid, sensors, sensor_setup, tolerances, conditions):
+        self.grid = grid
+        self.sensors = sensors
+        self.samples = tolerances.samples
+        self.seed = tolerances.seed
+        self.workers = tolerances.workers
+        self.conditions = {key.lower(): value for key, value in conditions.items()}
+        self.nominal = np.array(grid.metrics)
+        self.statistics = None
+
+        # the sensors are created in the order of the groups of the sensorset, so the definitions match the sensors
+        self.__definitions = load_sensor_definitions(sensor_setup)
+        if len(self.__definitions) != len(sensors):
+            raise ValueError("The sensorset does not match the calculated sensors")
+
+        # position and orientation tolerances and distribution of every sensor
+        self.__tolerances = []
+        for sensor in sensors:
+            tolerance = dict(tolerances.default, **tolerances.sensors.get(sensor.name, {}))
+            self.__tolerances.append(
+                (
+                    get_axis_tolerances(tolerance.get("position", 0), POSITION_AXES),
+                    get_axis_tolerances(tolerance.get("orientation", 0), ORIENTATION_AXES),
+                    tolerance.get("distribution", "normal"),
+                )
+            )
+
+    # private function that draws a sample of the sensorset, see evaluate_sample
+    def __draw_sample(self, rng):
+        sample = []
+        for (group, definition), (position, orientation, distribution) in zip(self.__definitions, self.__tolerances):
+            position = draw_deviations(rng, position, distribution)
+            orientation = draw_deviations(rng, orientation, distribution)
+            if not np.any(position) and not np.any(orientation):
+                sample.append(None)
+                continue
+            definition = copy.deepcopy(definition)
+            for axis, deviation in zip(POSITION_AXES, position.tolist()):
+                definition["position"][axis] += deviation
+            for axis, deviation in zip(ORIENTATION_AXES, orientation.tolist()):
+                definition["orientation"][axis] += deviation
+            sample.append((group, definition))
+        return sample
+
+    # private function that returns the indices of the sensors that only have an orientation tolerance
+    def __get_fixed_positions(self):
+        return {
+            i for i, (position, orientation, _) in enumerate(self.__tolerances)
+            if not np.any(position) and np.any(orientation)
+        }
+
+    # callable function that evaluates the samples and sets the statistics of the metrics. the samples are drawn and
+    # evaluated in batches, so only a batch of samples is held in memory
+    def analyze(self):
+        rng = np.random.default_rng(self.seed)
+        self.statistics = OnlineStatistics(self.nominal.shape)
+        samples = (self.__draw_sample(rng) for _ in range(self.samples))
+        initargs = (self.grid, self.sensors, self.__get_fixed_positions(), self.conditions)
+
+        if self.workers > 1:
+            with ProcessPoolExecutor(self.workers, initializer=init_worker, initargs=initargs) as executor:
+                batch = list(itertools.islice(samples, 4 * self.workers))
+                while batch:
+                    for metrics in executor.map(evaluate_sample, batch):
+                        self.statistics.update(metrics)
+                    batch = list(itertools.islice(samples, 4 * self.workers))
+        else:
+            # the samples change the combined data of the grid, so they are evaluated on a copy
+            init_worker(copy.deepcopy(self.grid), *initargs[1:])
+            for sample in samples:
+                self.statistics.update(evaluate_sample(sample))
+            WORKER_STATE.clear()
@@ -0,0 +1,52 @@
+import numpy as np
+
+
+# this class caches the visibility of a point matrix from the mount points of the sensors. the occlusion of a point
+# only depends on the position of the sensor and the occlusion mesh, not on its orientation or fov, so the visibility
+# of every point is ray traced once per position: the first time the point lies in the fov of a sensor at this
+# position. a sensor with a new orientation at a known position then only needs the fov test and the cached visibility
+class VisibilityCache:
+    def __init__(self, points, occlusion_mesh):
+        self.points = points
+        self.occlusion_mesh = occlusion_mesh
+        # visibility of the points for every position: -1 not traced yet, 0 occluded, 1 visible
+        self.visibility = {}
+
+    # private function that returns the visibility of the points with a fov mask from the position of the sensor and
+    # traces the points that were not traced from this position before
+    def __get_visibility(self, sensor, fov):
+        key = tuple(np.round(sensor.position, 6).tolist())
+        if key not in self.visibility:
+            self.visibility[key] = np.full(self.points.shape[0], -1, dtype=np.int8)
+        visibility = self.visibility[key]
+        unknown = np.nonzero(fov & (visibility < 0))[0]
+        if unknown.size:
+            visibility[unknown] = sensor.get_visibility(self.points[unknown], self.occlusion_mesh)
+        return visibility == 1
+
+    # callable function that returns the coverage of the points by the sensor (fov and occlusion) without changing
+    # the calculated results of the sensor. fov is the fov mask of the points, if it is already known (e.g. from a
+    # stencil), otherwise the fov test of the sensor is used
+    def get_point_coverage(self, sensor, fov=None):
+        fov = sensor.get_fov_mask(self.points) if fov is None else fov
+        return fov & self.__get_visibility(sensor, fov)
+
+    # callable function that computes the fov and the occlusion of the sensor like calculate_points of the sensor
+    def calculate_points(self, sensor):
+        fov = sensor.get_fov_mask(self.points)
+        occluded = fov & np.invert(self.__get_visibility(sensor, fov))
+        sensor.covered_indices = np.nonzero(fov)[0]
+        sensor.covered_points = np.take(self.points, sensor.covered_indices, axis=0)
+        sensor.occluded_indices = np.nonzero(occluded)[0]
+        sensor.occluded_points = np.take(self.points, sensor.occluded_indices, axis=0)
+        sensor.number_occluded_points = sensor.occluded_indices.size
+        sensor.calculation_result = fov & np.invert(occluded)
+
+    # callable function that computes the coverage of the sensor on the calc_points of the grid and sets its metrics
+    # like calculate_coverage of the sensor, e.g. to evaluate a rotated sensor before grid.update_sensor. the points
+    # of the cache have to be the calc_points of the grid
+    def calculate_coverage(self, sensor, grid, indexes=None, all_metrics=True):
+        self.calculate_points(sensor)
+        sensor.set_covered_points(grid)
+
+        sensor.set_metrics(grid, indexes, all_metrics)
@@ -0,0 +1,38 @@
+import numpy as np
+import yaml
+from easydict import EasyDict as edict
+
+from . import grid_helpers as helpers
+
+# this file contains the functions to load user defined zones from a yaml file and to rasterize them on the grid. a
+# zone is either a box, a polygon in the xy-plane extruded over a z range or an angular sector around a center
+
+
+def load_zones(yaml_file):
+    with open(yaml_file, "r") as file:
+        yaml_zones = yaml.safe_load(file)
+    zone_definition = edict(yaml_zones)
+
+    zone_list = []
+    for zone_type in ("boxes", "polygons", "sectors"):
+        if hasattr(zone_definition, zone_type):
+            for zone_data in zone_definition[zone_type]:
+                zone_data.type = zone_type
+                zone_list.append(zone_data)
+
+    return zone_list
+
+
+# function that returns a boolean array which is true for the points of a given point matrix within the zone
+def get_zone_mask(points, zone):
+    z_range = zone.get("z", [-np.inf, np.inf])
+    in_height = (points[:, 2] >= z_range[0]) & (points[:, 2] <= z_range[1])
+
+    if zone.type == "boxes":
+        bounds = (zone.x[0], zone.x[1], zone.y[0], zone.y[1], z_range[0], z_range[1])
+        return helpers.get_bounding_box_mask(points, bounds)
+    if zone.type == "polygons":
+        return in_height & helpers.get_polygon_mask(points, zone.points)
+    if zone.type == "sectors":
+        return in_height & helpers.get_sector_mask(points, zone.center, zone.radius, zone.angle)
+    raise ValueError(f"Unknown zone type {zone.type}")
@@ -1,6 +1,13 @@
+import csv
+
+import numpy as np
 import pyvista as pv
+import yaml
 
-from .plot_helpers import SENSOR_COLOR_MAP, metrics, setup_plot_args, output_folder
+from .plot_helpers import SENSOR_COLOR_MAP, areas, metrics, setup_plot_args, output_folder
+from environment.birds_eye_view import NO_DATA
+from sensors.sensor import TECHNOLOGIES
+from sensors.sensor_helpers import load_sensor_definitions, select_sensor_definitions
 
 pv.set_plot_theme(pv.themes.DocumentTheme())
 
@@ -240,3 +247,261 @@ def create_plots(grid, sensors, vehicle, path, name, slice_x, slice_y, slice_z):
     p5.camera_position = "xy"
     p5.save_graphic(overall_path / "plot5.pdf")
     p5.show()
+
+
+# callable function that saves the blind profile of the grid as table (blind_profile.csv) and as plot of the blind
+# distances against the height (blind_profile.png)
+def create_blind_profile(profile, path, name):
+    overall_path = output_folder(path, name)
+    columns = {
+        "x_max_front": (profile.x_max_front, "b", "-"),
+        "x_max_rear": (profile.x_max_rear, "red", "-"),
+        "y_max_left": (profile.y_max_left, "g", "--"),
+        "y_max_right": (profile.y_max_right, "orange", "--"),
+    }
+
+    with open(overall_path / "blind_profile.csv", "w", newline="") as profile_file:
+        writer = csv.writer(profile_file, delimiter=" ")
+        writer.writerow(["z", "blind_area"] + list(columns))
+        heights = [round(z, 4) for z in profile.z.tolist()]
+        distances = [values.tolist() for values, _, _ in columns.values()]
+        for row in zip(heights, profile.blind_area.tolist(), *distances):
+            writer.writerow(row)
+
+    chart = pv.Chart2D(x_label="distance to the first covered cell (m)", y_label="z (m)")
+    for label, (values, color, style) in columns.items():
+        chart.line(values, profile.z, color=color, style=style, label=label)
+    p = pv.Plotter(off_screen=True)
+    p.add_chart(chart)
+    p.screenshot(overall_path / "blind_profile.png")
+    p.close()
+
+
+# callable function that saves the statistics of the distance field of the grid as table (distance_field.csv) and the
+# fields with the shape (nz, ny, nx) of the cells as numpy archive (distance_field.npz)
+def save_distance_field(distance_field, path, name):
+    overall_path = output_folder(path, name)
+    rows = [
+        ("max_blind_distance", distance_field.max_blind_distance, "m"),
+        ("mean_blind_distance", distance_field.mean_blind_distance, "m"),
+        ("max_surface_distance", distance_field.max_surface_distance, "m"),
+        ("mean_surface_distance", distance_field.mean_surface_distance, "m"),
+        ("min_surface_distance", distance_field.min_surface_distance, "m"),
+    ]
+    with open(overall_path / "distance_field.csv", "w", newline="") as field_file:
+        writer = csv.writer(field_file, delimiter=" ")
+        writer.writerows(rows)
+
+    np.savez_compressed(
+        overall_path / "distance_field.npz",
+        coverage_distance=distance_field.coverage_distance,
+        vehicle_distance=distance_field.vehicle_distance,
+    )
+
+
+# callable function that saves the connected blind regions of the grid as table (blind_regions.csv), sorted by volume
+def save_blind_regions(blind_regions, path, name):
+    overall_path = output_folder(path, name)
+    with open(overall_path / "blind_regions.csv", "w", newline="") as regions_file:
+        writer = csv.writer(regions_file, delimiter=" ")
+        writer.writerow(
+            ("region", "volume_m^3", "x_min", "x_max", "y_min", "y_max", "z_min", "z_max", "vehicle_distance_m")
+        )
+        for i in range(blind_regions.number):
+            writer.writerow(
+                [i + 1, blind_regions.volume[i]] + blind_regions.bounds[i].tolist() + [blind_regions.vehicle_distance[i]]
+            )
+
+
+# callable function that saves the azimuth profile of the grid as table (azimuth_profile.csv) and as polar plot of the
+# blind range around the vehicle for every height band (azimuth_profile.png)
+def create_azimuth_profile(profile, path, name):
+    overall_path = output_folder(path, name)
+    with open(overall_path / "azimuth_profile.csv", "w", newline="") as profile_file:
+        writer = csv.writer(profile_file, delimiter=" ")
+        writer.writerow(
+            ("z_min", "z_max", "angle_min", "angle_max", "vehicle_radius", "first_covered_radius", "blind_range")
+        )
+        for band in range(profile.bands.size - 1):
+            for i in range(profile.bins):
+                writer.writerow(
+                    (
+                        profile.bands[band],
+                        profile.bands[band + 1],
+                        profile.angles[i],
+                        profile.angles[i + 1],
+                        profile.vehicle_radius[band, i],
+                        profile.first_covered_radius[band, i],
+                        profile.blind_range[band, i],
+                    )
+                )
+
+    # the blind range is drawn from the vehicle outward at the center angle of every bin as closed line for every band.
+    # bins without a blind range (nan, see AzimuthProfile) are left out of the line, a band without any is not drawn
+    angles = np.radians(profile.angles[:-1] + 180 / profile.bins)
+    chart = pv.Chart2D(x_label="x (m)", y_label="y (m)")
+    colors = ["b", "r", "g", "orange", "purple", "brown"]
+    for band in range(profile.bands.size - 1):
+        radius = profile.vehicle_radius[band] + profile.blind_range[band]
+        defined = np.nonzero(np.isfinite(radius))[0]
+        if defined.size == 0:
+            continue
+        defined = np.append(defined, defined[0])
+        radius = radius[defined]
+        chart.line(
+            radius * np.cos(angles[defined]),
+            radius * np.sin(angles[defined]),
+            color=colors[band % len(colors)],
+            label=f"z = {profile.bands[band]} - {profile.bands[band + 1]}m",
+        )
+    p = pv.Plotter(off_screen=True)
+    p.add_chart(chart)
+    p.screenshot(overall_path / "azimuth_profile.png")
+    p.close()
+
+
+# function that writes a raster (uint8) as binary pgm image. the rows of the image run from the highest to the lowest y,
+# so x points right and y up
+def write_pgm(filename, raster):
+    with open(filename, "wb") as raster_file:
+        raster_file.write(f"P5\n{raster.shape[1]} {raster.shape[0]}\n255\n".encode())
+        raster_file.write(np.ascontiguousarray(raster[::-1]).tobytes())
+
+
+# callable function that saves the rasters of the bird's-eye-view as binary pgm images (8 bit) in the directory bev.
+# the rows of the images run from the highest to the lowest y, so x points right and y up. bev.yaml contains the
+# georeferencing (origin of the lower left corner and resolution in m) and the files of every product and band
+def save_birds_eye_view(birds_eye_view, path, name):
+    bev_path = output_folder(path, name) / "bev"
+    bev_path.mkdir(exist_ok=True)
+    metadata = {
+        "resolution": float(birds_eye_view.resolution),
+        "origin": [float(value) for value in birds_eye_view.origin],
+        "width": int(birds_eye_view.products["covered"].shape[2]),
+        "height": int(birds_eye_view.products["covered"].shape[1]),
+        "no_data": NO_DATA,
+        "rasters": [],
+    }
+    for product, rasters in birds_eye_view.products.items():
+        for (z_min, z_max), raster in zip(birds_eye_view.bands.tolist(), rasters):
+            filename = f"{product}_z={z_min}-{z_max}m.pgm"
+            write_pgm(bev_path / filename, raster)
+            metadata["rasters"].append({"file": filename, "product": product, "z_min": z_min, "z_max": z_max})
+
+    with open(bev_path / "bev.yaml", "w") as metadata_file:
+        yaml.safe_dump(metadata, metadata_file, sort_keys=False)
+
+
+# callable function that saves the metrics of every height of the ground plane as csv file and the number of covering
+# sensors of every point as pgm image (8 bit) in the directory ground_plane. ground_plane.yaml contains the
+# georeferencing (origin of the lower left corner and resolution in m) and the file of every height
+def save_ground_plane(ground_plane, path, name):
+    ground_path = output_folder(path, name) / "ground_plane"
+    ground_path.mkdir(exist_ok=True)
+    technologies = sorted(TECHNOLOGIES, key=TECHNOLOGIES.get)
+    with open(ground_path / "ground_plane.csv", "w", newline="") as csv_file:
+        writer = csv.writer(csv_file, delimiter=" ")
+        writer.writerow(
+            ["height_m", "coverage_%"] + [f"{technology.lower()}_%" for technology in technologies] + ["blind_area_m^2"]
+        )
+        for height, metrics, blind_area in zip(
+            ground_plane.heights.tolist(), ground_plane.metrics.tolist(), ground_plane.blind_area.tolist()
+        ):
+            writer.writerow([height] + metrics + [blind_area])
+
+    x, y = ground_plane.shape
+    metadata = {
+        "resolution": float(ground_plane.spacing),
+        "origin": [float(value) for value in ground_plane.origin],
+        "width": x,
+        "height": y,
+        "no_data": NO_DATA,
+        "rasters": [],
+    }
+    for height, data in zip(ground_plane.heights.tolist(), ground_plane.data):
+        filename = f"n_sensors_z={height}m.pgm"
+        raster = np.where(data[:, :, 0] >= 0, np.clip(data[:, :, 1], 0, NO_DATA - 1), NO_DATA).astype(np.uint8)
+        write_pgm(ground_path / filename, raster)
+        metadata["rasters"].append({"file": filename, "product": "n_sensors", "z": height})
+
+    with open(ground_path / "ground_plane.yaml", "w") as metadata_file:
+        yaml.safe_dump(metadata, metadata_file, sort_keys=False)
+
+
+# callable function that saves the exact blind area and the maximum blind distances of every cross-section as table
+# (cross_sections.csv), the columns are named like the columns of the blind profile
+def save_cross_sections(cross_sections, path, name):
+    with open(output_folder(path, name) / "cross_sections.csv", "w", newline="") as sections_file:
+        writer = csv.writer(sections_file, delimiter=" ")
+        writer.writerow(["z", "blind_area", "x_max_front", "x_max_rear", "y_max_left", "y_max_right"])
+        for section in cross_sections:
+            writer.writerow(
+                [
+                    section.height,
+                    section.blind_area,
+                    float(section.x_max_front),
+                    float(section.x_max_rear),
+                    float(section.y_max_left),
+                    float(section.y_max_right),
+                ]
+            )
+
+
+# callable function that saves the steps of the sensor placement as table (placement.csv) and the selected candidates
+# as sensorset (placement.yaml), that can be evaluated with --sensors
+def save_placement(optimizer, path, name):
+    overall_path = output_folder(path, name)
+    with open(overall_path / "placement.csv", "w", newline="") as placement_file:
+        writer = csv.writer(placement_file, delimiter=" ")
+        writer.writerow(["step", "name", "cost", "weighted_gain_m^3", "coverage_%"])
+        steps = zip(optimizer.selected, optimizer.gains, optimizer.coverage)
+        for step, (candidate, gain, coverage) in enumerate(steps):
+            sensor = optimizer.candidates.sensors[candidate]
+            writer.writerow([step + 1, sensor.name, float(optimizer.candidates.costs[candidate]), gain, coverage])
+
+    sensorset = select_sensor_definitions(optimizer.candidates.definitions, optimizer.selected)
+    with open(overall_path / "placement.yaml", "w") as sensorset_file:
+        yaml.safe_dump(sensorset, sensorset_file, sort_keys=False)
+
+
+# callable function that saves the result of the subset selection as tables (subset.csv with every sensor, subset-
+# targets.csv with the coverage and the status of every target: met or infeasible, i.e. not met by the whole sensorset
+# and only kept at the best possible coverage) and the selected sensors of the sensorset as subset.yaml
+def save_subset(selection, sensor_setup, path, name):
+    overall_path = output_folder(path, name)
+    with open(overall_path / "subset.csv", "w", newline="") as subset_file:
+        writer = csv.writer(subset_file, delimiter=" ")
+        writer.writerow(["name", "cost", "selected"])
+        for i, sensor in enumerate(selection.sensors):
+            writer.writerow([sensor.name, float(selection.costs[i]), i in selection.selected])
+
+    with open(overall_path / "subset-targets.csv", "w", newline="") as targets_file:
+        writer = csv.writer(targets_file, delimiter=" ")
+        writer.writerow(["area", "n_sensors", "target_%", "sensorset_%", "subset_%", "status"])
+        for i, target in enumerate(selection.targets):
+            status = "infeasible" if selection.infeasible[i] else "met"
+            coverage = [selection.full_coverage[i], selection.coverage[i]]
+            writer.writerow([target.area, target.n_sensors, target.coverage] + coverage + [status])
+
+    subset = select_sensor_definitions(load_sensor_definitions(sensor_setup), selection.selected)
+    with open(overall_path / "subset.yaml", "w") as subset_file:
+        yaml.safe_dump(subset, subset_file, sort_keys=False)
+
+
+# callable function that saves the statistics of the tolerance analysis as table (tolerance.csv) with the nominal
+# value, the mean, the standard deviation and the worst case (minimum) of every metric of every area
+def save_tolerance(analysis, path, name):
+    area_names = {index: area for area, index in areas.items()}
+    metric_names = {index: metric for metric, index in metrics.items()}
+    statistics = analysis.statistics
+    with open(output_folder(path, name) / "tolerance.csv", "w", newline="") as tolerance_file:
+        writer = csv.writer(tolerance_file, delimiter=" ")
+        writer.writerow(["area", "metric", "nominal_%", "mean_%", "std_%", "worst_%"])
+        for area, metric in np.ndindex(analysis.nominal.shape):
+            writer.writerow(
+                [area_names[area], metric_names.get(metric, metric), float(analysis.nominal[area, metric])]
+                + [
+                    round(float(value[area, metric]), 2)
+                    for value in (statistics.mean, statistics.std, statistics.minimum)
+                ]
+            )
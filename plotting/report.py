@@ -136,13 +136,52 @@ def create_report(
         )
         p.close()
 
-    # save the calculated data from grid as 2 csv files
-    np.savetxt(path_sensorset / "metrics.csv", grid.metrics, fmt="%s")
+    # save the calculated data from grid as 2 csv files. the metrics are queried from the histograms of the grid, so
+    # they always correspond to the passed conditions
+    metrics_matrix = grid.query_metrics(n1=n1, n2=n2, n6=n6, n7=n7, n8=n8)
+    np.savetxt(path_sensorset / "metrics.csv", metrics_matrix, fmt="%s")
     bs_vol_row1 = "blind_spot_volume", grid.blind_spot_volume, "m^3"
     with open(path_sensorset / "blindspotvolume.csv", "w", newline="") as bs_vol:
         writer = csv.writer(bs_vol, delimiter=" ")
         writer.writerow(bs_vol_row1)
 
+    # save the metrics of the user defined zones as csv file, every row contains the zone name and its metrics
+    if grid.zone_names:
+        zone_metrics = grid.query_zone_metrics(n1=n1, n2=n2, n6=n6, n7=n7, n8=n8)
+        with open(path_sensorset / "zones.csv", "w", newline="") as zones_file:
+            writer = csv.writer(zones_file, delimiter=" ")
+            for name, row in zip(grid.zone_names, zone_metrics):
+                writer.writerow([name] + row.tolist())
+
+    # save the shared volume of every pair of sensors as 2 csv files, overlap.csv contains the matrix of the total area
+    # and overlap-areas.csv every pair of sensors with shared volume per area
+    overlap = grid.compute_overlap_matrix(sensors, by_area=True)
+    names = [sensor.name for sensor in sensors]
+    with open(path_sensorset / "overlap.csv", "w", newline="") as overlap_file:
+        writer = csv.writer(overlap_file, delimiter=" ")
+        writer.writerow(["sensor"] + names)
+        for name, row in zip(names, overlap[areas["total"]]):
+            writer.writerow([name] + row.tolist())
+    with open(path_sensorset / "overlap-areas.csv", "w", newline="") as overlap_file:
+        writer = csv.writer(overlap_file, delimiter=" ")
+        writer.writerow(("area", "sensor_1", "sensor_2", "shared_volume_m^3"))
+        for area, index in areas.items():
+            for i, j in zip(*np.nonzero(np.triu(overlap[index]))):
+                writer.writerow((area, names[i], names[j], overlap[index, i, j]))
+
+    # save the N-1 analysis of the sensorset as 2 csv files, the sensors are ranked by the volume that is lost by their
+    # failure. n-1-metrics.csv contains the coverage of every area after the failure in the same order
+    failure_metrics, lost_volume, failure_bs_volume = grid.compute_failure_metrics(sensors)
+    ranking = np.argsort(-lost_volume, kind="stable")
+    np.savetxt(path_sensorset / "n-1-metrics.csv", failure_metrics[ranking], fmt="%s")
+    with open(path_sensorset / "n-1.csv", "w", newline="") as failure_file:
+        writer = csv.writer(failure_file, delimiter=" ")
+        writer.writerow(("failed_sensor", "lost_volume_m^3", "blind_spot_volume_m^3", "total_coverage_%"))
+        for i in ranking:
+            writer.writerow(
+                (sensors[i].name, lost_volume[i], failure_bs_volume[i], failure_metrics[i, areas["total"]])
+            )
+
     # save the calculated data from each sensor as 2 csv files
     for sensor in sensors:
         filename = f"{sensor.name}-vector.csv".replace(" ", "-")
@@ -253,6 +292,37 @@ def create_report(
     bs_vol_table.setStyle(table_style)
     story.append(bs_vol_table)
 
+    # create a table for the metrics of the user defined zones from the csv file using pandas dataframes
+    if grid.zone_names:
+        story.append(pp.Spacer(1, 0.1 * inch))
+        story.append(pp.Paragraph("The metrics of the user defined zones with the same columns:"))
+        dataframe_zones = pd.read_csv(path_sensorset / "zones.csv", header=None, delimiter=" ")
+        table_data4 = []
+        for index, row in dataframe_zones.iterrows():
+            table_data4.append(row.tolist())
+        zones_table = pp.Table(table_data4)
+        zones_table.setStyle(table_style)
+        story.append(zones_table)
+
+    story.append(pp.PageBreak())
+
+    # create a table for the N-1 analysis of the sensorset from the csv file using pandas dataframes
+    story.append(pp.Paragraph(str("N-1 analysis"), styles["Title"]))
+    story.append(
+        pp.Paragraph(
+            "This table contains the volume that is no longer covered if a single sensor fails, the resulting blind "
+            "spot volume and the coverage of the total area. The sensors are ranked by the lost volume."
+        )
+    )
+    story.append(pp.Spacer(1, 0.1 * inch))
+    dataframe_failure = pd.read_csv(path_sensorset / "n-1.csv", header=None, delimiter=" ")
+    table_data3 = []
+    for index, row in dataframe_failure.iterrows():
+        table_data3.append(row.tolist())
+    failure_table = pp.Table(table_data3)
+    failure_table.setStyle(table_style)
+    story.append(failure_table)
+
     story.append(pp.PageBreak())
 
     # create lists of csv files for each slice and each sensor in the corresponding directories
@@ -1,3 +1,4 @@
+import csv
 import logging
 import pickle
 import time
@@ -5,32 +6,52 @@ import pyvista as pv
 
 from args import args
 from environment.grid import Grid
-from environment.slice import Slice
+from environment.azimuth_profile import AzimuthProfile
+from environment.birds_eye_view import BirdsEyeView
+from environment.blind_regions import BlindRegions
+from environment.cross_section import CrossSection
+from environment.distance_field import DistanceField
+from environment.ground_plane import GroundPlane
+from environment.placement import PlacementOptimizer, load_candidates
+from environment.profile import BlindProfile
+from environment.results import Results
+from environment.subset import SubsetSelection, load_targets
+from environment.tolerance import ToleranceAnalysis, load_tolerances
+from environment.zones import load_zones
 from plotting.report import create_report
-from plotting.plots import create_plots
+from plotting.plots import (
+    create_azimuth_profile,
+    create_blind_profile,
+    create_plots,
+    save_birds_eye_view,
+    save_blind_regions,
+    save_cross_sections,
+    save_distance_field,
+    save_ground_plane,
+    save_placement,
+    save_subset,
+    save_tolerance,
+)
 from plotting.plot_helpers import metrics, setup_plot_args, output_folder
-from sensors.sensor_helpers import load_sensorset
+from sensors.sensor_helpers import calculate_coverage, load_sensorset
 from utils.gui import GUI
 
 # PROGRAM OPTIONS
 logging.basicConfig(format='%(levelname)s:%(message)s', level=logging.DEBUG)
 
 
-def run(args):
-    """Main function for the program.
+def calculate_grid(args):
+    """Calculates the coverage of the sensorset on the grid around the vehicle.
 
     Args:
         args: input arguments provided by YAML-config file or command line.
+
+    Returns:
+        the grid with the combined data, the vehicle and the list of sensors.
     """
 
-    logging.info("Starting Programm")
     sensors = load_sensorset(args.sensor_setup)
-
-    if args.gui_mode:
-        gui_instance = GUI()
-        gui_instance.run()
-        args.update(gui_instance.get_inputs())
-    logging.info("Inputs evaluated -> now loading vehicle")
+    logging.info("Sensors loaded -> now loading vehicle")
 
     vehicle = pv.read(args.vehicle_path).triangulate()
     logging.info("Vehicle loaded -> creating grid")
@@ -47,15 +68,48 @@ def run(args):
     )
     logging.info("Grid created -> starting single sensor coverage calculation")
 
-    ix = 1
-    max_ix = len(sensors)
-    for sensor in sensors:
-        logging.info(f"Calculating Single Sensor {ix} of {max_ix}")
-        sensor.calculate_coverage(grid, vehicle)
-        ix += 1
+    calculate_coverage(
+        sensors,
+        grid,
+        vehicle,
+        symmetry=args.get("symmetry", False),
+        vehicle_tolerance=args.get("symmetry_tolerance", 1e-3),
+    )
     logging.info("Finished single sensor calculation -> calculating grid coverage")
 
     grid.combine_data(sensors)
+    return grid, vehicle, sensors
+
+
+def evaluate_outputs(args, results):
+    """Evaluates only the requested outputs for headless runs and saves them as csv file.
+
+    Args:
+        args: input arguments provided by YAML-config file or command line.
+        results: lazy results of the grid.
+    """
+
+    logging.info("Evaluating requested outputs")
+    values = results.evaluate(args.outputs)
+    save_path = output_folder(args.save_path, args.folder_name) / "outputs.csv"
+    with open(save_path, "w", newline="") as outputs_file:
+        writer = csv.writer(outputs_file, delimiter=" ")
+        for output, value in values.items():
+            logging.info(f"{output}: {value}")
+            writer.writerow((output, value))
+
+
+def create_outputs(args, grid, vehicle, sensors, results):
+    """Sets all metrics of the grid and creates the report and plots.
+
+    Args:
+        args: input arguments provided by YAML-config file or command line.
+        grid: grid with the combined data of the sensorset.
+        vehicle: the vehicle mesh.
+        sensors: list of the calculated sensors.
+        results: lazy results of the grid.
+    """
+
     grid.set_metrics_no_condition()
     grid.set_metrics_condition(
         n1=args.conditions.N1,
@@ -66,14 +120,83 @@ def run(args):
     )
     logging.info("Grid coverage calculated -> preparing report and plots")
 
+    if args.blind_profile:
+        logging.info("Creating blind profile")
+        create_blind_profile(BlindProfile(grid), args.save_path, args.folder_name)
+    if args.distance_field:
+        logging.info("Creating distance field")
+        save_distance_field(DistanceField(grid), args.save_path, args.folder_name)
+    if args.blind_regions:
+        logging.info("Labeling blind regions")
+        save_blind_regions(BlindRegions(grid), args.save_path, args.folder_name)
+    if args.azimuth_profile:
+        logging.info("Creating azimuth profile")
+        profile = AzimuthProfile(grid, **args.get("azimuth", {}))
+        create_azimuth_profile(profile, args.save_path, args.folder_name)
+    if args.birds_eye_view:
+        logging.info("Creating bird's-eye-view rasters")
+        save_birds_eye_view(BirdsEyeView(grid, **args.get("bev", {})), args.save_path, args.folder_name)
+    if args.ground_plane:
+        logging.info("Calculating ground plane coverage")
+        ground_plane = GroundPlane(
+            dim_x=args.dim_x,
+            dim_y=args.dim_y,
+            center=args.origin,
+            car=vehicle,
+            advanced=args.advanced,
+            **args.get("ground", {}),
+        )
+        ground_plane.calculate_coverage(sensors, vehicle)
+        save_ground_plane(ground_plane, args.save_path, args.folder_name)
+    if args.exact_sections:
+        logging.info("Calculating exact cross-sections")
+        settings = args.get("cross_section", {})
+        cross_sections = []
+        for height in settings.get("heights", [0.01]):
+            cross_section = CrossSection(
+                dim_x=args.dim_x,
+                dim_y=args.dim_y,
+                center=args.origin,
+                car=vehicle,
+                height=height,
+                resolution=settings.get("resolution", 0.01),
+                advanced=args.advanced,
+            )
+            cross_section.calculate_coverage(sensors, vehicle)
+            cross_sections.append(cross_section)
+        save_cross_sections(cross_sections, args.save_path, args.folder_name)
+    if args.placement:
+        logging.info("Optimizing sensor placement")
+        optimizer = PlacementOptimizer(grid, load_candidates(args.placement, vehicle, grid))
+        optimizer.optimize()
+        save_placement(optimizer, args.save_path, args.folder_name)
+    if args.min_subset:
+        logging.info("Selecting minimum sensor subset")
+        selection = SubsetSelection(grid, sensors, load_targets(args.min_subset))
+        selection.select()
+        dropped = [sensors[i].name for i in selection.dropped]
+        if selection.infeasible.any():
+            logging.info(f"Sensors that can be dropped (best possible for infeasible targets): {dropped}")
+        else:
+            logging.info(f"Sensors that can be dropped: {dropped}")
+        save_subset(selection, args.sensor_setup, args.save_path, args.folder_name)
+    if args.tolerance:
+        logging.info("Evaluating mounting tolerances")
+        analysis = ToleranceAnalysis(grid, sensors, args.sensor_setup, load_tolerances(args.tolerance), args.conditions)
+        analysis.analyze()
+        save_tolerance(analysis, args.save_path, args.folder_name)
+
+    # the slices are only created if they are used by the report or the plots
+    if not args.create_report and args.no_plots:
+        return
     slices = [
-        Slice(grid, 1.5, normal="x"),
-        Slice(grid, 0, normal="y"),
-        Slice(grid, 0.01),
+        results.get_slice(1.5, normal="x"),
+        results.get_slice(0, normal="y"),
+        results.get_slice(0.01),
     ]
     slices.extend(
         [
-            Slice(grid, i * args.slice.distance)
+            results.get_slice(i * args.slice.distance)
             for i in range(1, args.slice.number, 1)
         ]
     )
@@ -113,6 +236,38 @@ def run(args):
         )
         logging.info("Report created -> finished")
 
+
+def run(args):
+    """Main function for the program.
+
+    Args:
+        args: input arguments provided by YAML-config file or command line.
+    """
+
+    logging.info("Starting Programm")
+    if args.gui_mode:
+        gui_instance = GUI(args.get("conditions"))
+        gui_instance.run()
+        args.update(gui_instance.get_inputs())
+    logging.info("Inputs evaluated")
+
+    if args.load_variables:
+        # the coverage of a previous simulation is reused, the conditions are queried from the histograms of the grid
+        logging.info("Loading variables -> evaluating conditions")
+        with open(args.load_variables, "rb") as f:
+            saved = pickle.load(f)
+        grid, vehicle, sensors = saved["grid"], saved["vehicle"], saved["sensors"]
+    else:
+        grid, vehicle, sensors = calculate_grid(args)
+    if args.zones:
+        grid.set_zones(load_zones(args.zones))
+
+    results = Results(grid, args.conditions)
+    if args.outputs:
+        evaluate_outputs(args, results)
+    else:
+        create_outputs(args, grid, vehicle, sensors, results)
+
     if args.save_variables:
         save_path = output_folder(args.save_path, args.folder_name) / "save_data.pkl"
         with open(save_path, "wb") as f:
@@ -39,6 +39,12 @@ class Camera(Sensor):
 
     # private function to compute the points inside the fov of the camera. takes a point matrix of shape nx3 as input
     def __is_inside_matrix(self, points_matrix):
+        self.calculation_result = self.get_fov_mask(points_matrix)
+        self.covered_indices = np.nonzero(self.calculation_result)[0]
+        self.covered_points = np.take(points_matrix, self.covered_indices, axis=0)
+
+    # function that returns a boolean array which is true for the points of a point matrix inside the fov
+    def get_fov_mask(self, points_matrix):
         # get the vectors from the sensor position to the points and the side-facing normals of the fov
         sensor_position_matrix = np.tile(self.position, (points_matrix.shape[0], 1))
         difference_matrix = points_matrix - sensor_position_matrix
@@ -54,16 +60,27 @@ class Camera(Sensor):
         is_in_distance = np.logical_and(dist >= self.min_dist, dist <= self.max_dist)
 
         # combine the calculated boolean results to obtain points inside the fov
-        self.calculation_result = bool_dot_product & is_in_distance
-        self.covered_indices = np.nonzero(self.calculation_result)[0]
-        self.covered_points = np.take(points_matrix, self.covered_indices, axis=0)
+        return bool_dot_product & is_in_distance
+
+    # function that returns the parameters t where the lines origins + t * direction cross the borders of the fov: the
+    # side faces and the planes of min and max distance
+    def get_fov_crossings(self, origins, direction):
+        normals = np.vstack((self.mesh.face_normals[1:5], self.coordinate_system[:, 0], self.coordinate_system[:, 0]))
+        offsets = -normals @ self.position - np.array([0, 0, 0, 0, self.min_dist, self.max_dist])
+        return helpers.get_plane_crossings(origins, direction, np.column_stack((normals, offsets)))
+
+    # function that returns the parameters defining the shape of the fov, used to compare two cameras
+    def fov_parameters(self):
+        return np.array([self.fov, self.max_dist, self.min_dist, self.aspect_ratio])
+
+    # function that computes the fov and the occlusion for an arbitrary point matrix without setting the metrics
+    def calculate_points(self, points_matrix, occlusion_mesh):
+        self.__is_inside_matrix(points_matrix)
+        self.is_occluded_matrix(occlusion_mesh)
 
     # function that is called by the main program to compute the camera coverage and set the metrics
     def calculate_coverage(self, grid, occlusion_mesh, indexes=None, all_metrics=True):
-        self.__is_inside_matrix(grid.calc_points)
-        self.is_occluded_matrix(occlusion_mesh)
-        self.covered_indices = np.nonzero(self.calculation_result)[0]
-        self.covered_points = np.take(grid.calc_points, self.covered_indices, axis=0)
-        self.number_covered_points = self.covered_indices.size
+        self.calculate_points(grid.calc_points, occlusion_mesh)
+        self.set_covered_points(grid)
 
         self.set_metrics(grid, indexes, all_metrics)
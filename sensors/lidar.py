@@ -49,6 +49,12 @@ class Lidar(Sensor):
 
     # private function to compute the points inside the fov of the lidar. takes a point matrix of shape nx3 as input
     def __is_inside_matrix(self, points_matrix):
+        self.calculation_result = self.get_fov_mask(points_matrix)
+        self.covered_indices = np.nonzero(self.calculation_result)[0]
+        self.covered_points = np.take(points_matrix, self.covered_indices, axis=0)
+
+    # function that returns a boolean array which is true for the points of a point matrix inside the fov
+    def get_fov_mask(self, points_matrix):
         # get the vectors from the sensor position to the points and the transformation matrix to local coordinates
         sensor_position_matrix = np.tile(self.position, (points_matrix.shape[0], 1))
         vectors = points_matrix - sensor_position_matrix
@@ -68,16 +74,41 @@ class Lidar(Sensor):
         vectors_bool = np.vstack((dist, theta, phi))
 
         # the point is inside, if the corresponding row contains only true. this is checked here
-        self.calculation_result = np.all(vectors_bool, axis=0)
-        self.covered_indices = np.nonzero(self.calculation_result)[0]
-        self.covered_points = np.take(points_matrix, self.covered_indices, axis=0)
+        return np.all(vectors_bool, axis=0)
+
+    # function that returns the parameters t where the lines origins + t * direction cross the borders of the fov: the
+    # spheres of min and max range, the planes through the local z axis at the horizontal borders (and behind the
+    # sensor, where the horizontal angle jumps) and the cone of the vertical borders
+    def get_fov_crossings(self, origins, direction):
+        crossings = []
+        for radius in (self.min_range, self.max_dist):
+            crossings.append(
+                helpers.get_quadric_crossings(origins, direction, self.position, np.eye(3), radius**2)
+            )
+
+        angles = np.radians([self.fov_h / 2, -self.fov_h / 2, 0])
+        normals = np.column_stack((-np.sin(angles), np.cos(angles), np.zeros(3))) @ np.transpose(self.coordinate_system)
+        equations = np.column_stack((normals, -normals @ self.position))
+        crossings.append(helpers.get_plane_crossings(origins, direction, equations))
+
+        if self.fov_v < 180:
+            slope = np.tan(np.radians(self.fov_v / 2)) ** 2
+            cone = self.coordinate_system @ np.diag([-slope, -slope, 1]) @ np.transpose(self.coordinate_system)
+            crossings.append(helpers.get_quadric_crossings(origins, direction, self.position, cone, 0))
+        return np.hstack(crossings)
+
+    # function that returns the parameters defining the shape of the fov, used to compare two lidars
+    def fov_parameters(self):
+        return np.array([self.fov_h, self.fov_v, self.max_dist, self.min_range])
+
+    # function that computes the fov and the occlusion for an arbitrary point matrix without setting the metrics
+    def calculate_points(self, points_matrix, occlusion_mesh):
+        self.__is_inside_matrix(points_matrix)
+        self.is_occluded_matrix(occlusion_mesh)
 
     # function that is called by the main program to compute the lidar coverage and set the metrics
     def calculate_coverage(self, grid, occlusion_mesh, indexes=None, all_metrics=True):
-        self.__is_inside_matrix(grid.calc_points)
-        self.is_occluded_matrix(occlusion_mesh)
-        self.covered_indices = np.nonzero(self.calculation_result)[0]
-        self.covered_points = np.take(grid.calc_points, self.covered_indices, axis=0)
-        self.number_covered_points = self.covered_indices.size
+        self.calculate_points(grid.calc_points, occlusion_mesh)
+        self.set_covered_points(grid)
 
         self.set_metrics(grid, indexes, all_metrics)
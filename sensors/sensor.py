@@ -1,6 +1,32 @@
 import numpy as np
 from scipy.spatial.transform import Rotation as R
 
+from environment import grid_helpers as helpers
+
+# registry that maps the sensor types to the technology columns of the combined data of the grid. for technology t,
+# column 3 + t counts whether and column 3 + len(TECHNOLOGIES) + t how many sensors of this type cover a point. a new
+# sensor technology is added to the evaluation with register_technology, without changes to the grid
+TECHNOLOGIES = {}
+
+
+def register_technology(name):
+    return TECHNOLOGIES.setdefault(name, len(TECHNOLOGIES))
+
+
+register_technology("Camera")
+register_technology("Lidar")
+register_technology("Radar")
+
+# attributes of a sensor set by calculate_points, restored after the coverage of other points was computed
+CALCULATION_STATE = (
+    "calculation_result",
+    "covered_indices",
+    "covered_points",
+    "occluded_indices",
+    "occluded_points",
+    "number_occluded_points",
+)
+
 
 # this class contains generic sensor properties and functions that are used by every sensortype. it acts as a parent
 # class for camera lidar and radar
@@ -67,6 +93,30 @@ class Sensor:
             [self.position[0] + x, self.position[1] + y, self.position[2] + z]
         )
 
+    # function that returns the technology of the sensor from the registry, sensor types that are not registered inherit
+    # the technology of their parent class. returns -1 if no technology is registered
+    def get_technology(self):
+        for sensor_class in type(self).__mro__:
+            if sensor_class.__name__ in TECHNOLOGIES:
+                return TECHNOLOGIES[sensor_class.__name__]
+        return -1
+
+    # function that checks whether the fov of this sensor is the mirror image of the fov of another sensor about the
+    # xz-plane (y = 0). a sensor on y = 0 looking along the xz-plane is a mirror image of itself
+    def is_mirror_of(self, other, tolerance=1e-3):
+        if type(self) is not type(other):
+            return False
+        mirror = np.diag([1, -1, 1])
+        # mirroring a local coordinate system about y = 0 is done by M * C * M, which also keeps it right-handed
+        mirrored_coordinate_system = np.matmul(
+            np.matmul(mirror, other.coordinate_system), mirror
+        )
+        return (
+            np.allclose(self.fov_parameters(), other.fov_parameters())
+            and np.allclose(self.position, np.matmul(mirror, other.position), atol=tolerance)
+            and np.allclose(self.coordinate_system, mirrored_coordinate_system, atol=tolerance)
+        )
+
     # private function, that checks whether a computed occlusion was correct. It does so by comparing the distance to
     # the occluded point with the distance to the hit point with the vehicle surface
     def __check_occlusion(self, rays, intersection_points, occluded_points):
@@ -114,70 +164,85 @@ class Sensor:
         self.occluded_indices = occluded_indices
         self.number_occluded_points = self.occluded_indices.size
 
+    # function that returns the coverage of an arbitrary point matrix (fov and occlusion) without changing the
+    # calculated results of the sensor on the grid, e.g. for the ground plane
+    def get_point_coverage(self, points_matrix, occlusion_mesh):
+        state = [getattr(self, name) for name in CALCULATION_STATE]
+        self.calculate_points(points_matrix, occlusion_mesh)
+        result = self.calculation_result
+        for name, value in zip(CALCULATION_STATE, state):
+            setattr(self, name, value)
+
+        return result
+
+    # function that returns whether the points of a point matrix are visible from the position of the sensor, i.e. not
+    # occluded by the occlusion mesh, independent of the fov. the calculated results of the sensor are not changed
+    def get_visibility(self, points_matrix, occlusion_mesh):
+        state = [getattr(self, name) for name in CALCULATION_STATE]
+        self.calculation_result = np.full(points_matrix.shape[0], True)
+        self.covered_indices = np.arange(points_matrix.shape[0])
+        self.covered_points = points_matrix
+        self.is_occluded_matrix(occlusion_mesh)
+        result = self.calculation_result
+        for name, value in zip(CALCULATION_STATE, state):
+            setattr(self, name, value)
+
+        return result
+
+    # function that returns the intervals (line, start, end) of the lines origins + t * direction between low and high,
+    # that are covered by the sensor. the fov of a line is exact between the crossings with the borders of the fov
+    # (get_fov_crossings and get_fov_mask of the sensor type), then the shadows of the occlusion mesh are subtracted
+    def get_line_intervals(self, origins, direction, low, high, occlusion_mesh):
+        crossings = self.get_fov_crossings(origins, direction)
+        fov = helpers.get_inside_segments(origins, direction, low, high, crossings, self.get_fov_mask)
+        # only the lines crossing the fov can be occluded
+        fov_lines = np.unique(fov[0])
+        triangles = occlusion_mesh.points[occlusion_mesh.faces.reshape(-1, 4)[:, 1:]]
+        shadow = helpers.get_shadow_intervals(self.position, origins[fov_lines], direction, triangles)
+        shadow = (fov_lines[shadow[0]], shadow[1], shadow[2])
+
+        labels = np.repeat([0, 1], [fov[0].size, shadow[0].size])
+        lines, starts, ends, counts = helpers.sweep_intervals(
+            np.concatenate((fov[0], shadow[0])),
+            np.concatenate((fov[1], shadow[1])),
+            np.concatenate((fov[2], shadow[2])),
+            labels,
+            2,
+        )
+        covered = (counts[:, 0] > 0) & (counts[:, 1] == 0)
+        return lines[covered], starts[covered], ends[covered]
+
+    # function to set the covered indices and points of the calc_points of the grid from the calculation result
+    def set_covered_points(self, grid):
+        self.covered_indices = np.nonzero(self.calculation_result)[0]
+        self.covered_points = np.take(grid.calc_points, self.covered_indices, axis=0)
+        self.number_covered_points = self.covered_indices.size
+
+    # function to set an externally computed coverage of the calc_points of the grid, e.g. the mirrored coverage of
+    # another sensor. the results are stored like in calculate_coverage, the metrics are set afterwards (set_metrics)
+    def set_coverage(self, grid, calculation_result, occluded_indices):
+        self.calculation_result = calculation_result
+        self.set_covered_points(grid)
+        self.occluded_indices = np.sort(occluded_indices)
+        self.occluded_points = np.take(grid.calc_points, self.occluded_indices, axis=0)
+        self.number_occluded_points = self.occluded_indices.size
+
     # function to set the sensor metrics, that is called after the calculation is done
     def set_metrics(self, grid, indexes=None, all_metrics=True):
-        # calculate volume metrics
-        cell_volume = grid.mesh.spacing[0] ** 3
-        self.occluded_volume = round(self.occluded_indices.size * cell_volume, 2)
-        self.covered_volume = round(self.covered_indices.size * cell_volume, 2)
+        metrics, covered_volume, occluded_volume = grid.compute_sensor_metrics([self])
+        self.set_metric_values(metrics[0], covered_volume[0], occluded_volume[0], indexes, all_metrics)
+
+    # function to set the sensor metrics from precomputed values, e.g. a row of Grid.compute_sensor_metrics
+    def set_metric_values(
+        self, metrics, covered_volume, occluded_volume, indexes=None, all_metrics=True
+    ):
+        self.occluded_volume = float(occluded_volume)
+        self.covered_volume = float(covered_volume)
         self.fraction_occluded = round(
             100 * self.occluded_volume / (self.covered_volume + self.occluded_volume), 1
         )
 
         if all_metrics:
             indexes = np.arange(18)
-
-        # get the area indices to calculate the sensors performance in every area
-        area_indices = None
-        for index in indexes:
-            data = self.__single_sensor_data(grid)
-            match index:
-                case 0:
-                    area_indices = grid.far_front_left_indices
-                case 1:
-                    area_indices = grid.far_front_center_indices
-                case 2:
-                    area_indices = grid.far_front_right_indices
-                case 3:
-                    area_indices = grid.near_front_left_indices
-                case 4:
-                    area_indices = grid.near_front_center_indices
-                case 5:
-                    area_indices = grid.near_front_right_indices
-                case 6:
-                    area_indices = grid.far_left_indices
-                case 7:
-                    area_indices = grid.near_left_indices
-                case 8:
-                    area_indices = grid.near_right_indices
-                case 9:
-                    area_indices = grid.far_right_indices
-                case 10:
-                    area_indices = grid.near_rear_left_indices
-                case 11:
-                    area_indices = grid.near_rear_center_indices
-                case 12:
-                    area_indices = grid.near_rear_right_indices
-                case 13:
-                    area_indices = grid.far_rear_left_indices
-                case 14:
-                    area_indices = grid.far_rear_center_indices
-                case 15:
-                    area_indices = grid.far_rear_right_indices
-                case 16:
-                    area_indices = grid.car_area_indices
-                case 17:
-                    area_indices = grid.outside_indices
-
-            # divide the covered points in an area by the number of points in an area
-            data = data[area_indices]
-            indices = np.nonzero(data == 1)[0]
-            self.metrics[index] = round((indices.size / area_indices.size) * 100, 1)
-
-    # helper function that is used to bring the number of rows in the sensor calculation_result to the number of total
-    # points of the grid. this way, the area indices can be used correctly on the calculation result
-    def __single_sensor_data(self, grid):
-        data = np.zeros(grid.points.shape[0])
-        np.put(data, grid.car_points_indices, 2)
-        np.put(data, grid.outside_indices, self.calculation_result)
-        return data
+        indexes = np.asarray(indexes, dtype=int)
+        self.metrics[indexes, 0] = metrics[indexes]
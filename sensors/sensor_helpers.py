@@ -1,3 +1,6 @@
+import logging
+
+import numpy as np
 import yaml
 from easydict import EasyDict as edict
 
@@ -5,10 +8,36 @@ from .camera import Camera
 from .lidar import Lidar
 from .radar import Radar
 
+# sensor groups of a sensorset definition, in the order of the sensors created by create_sensorset
+SENSOR_GROUPS = ("cameras", "lidars", "radars")
+
 
 def load_sensorset(yaml_file):
     with open(yaml_file, 'r') as file:
         yaml_sensors = yaml.safe_load(file)
+    return create_sensorset(yaml_sensors)
+
+
+# function that returns the group and the definition of every sensor of a sensorset yaml file in the order of the
+# sensors created by create_sensorset, so the index of a sensor selects its definition
+def load_sensor_definitions(yaml_file):
+    with open(yaml_file, 'r') as file:
+        yaml_sensors = yaml.safe_load(file)
+    return [(group, sensor) for group in SENSOR_GROUPS for sensor in yaml_sensors.get(group, [])]
+
+
+# function that returns the sensorset definition of the selected sensors from their groups and definitions (see
+# load_sensor_definitions), e.g. to save a subset of the sensors as yaml file
+def select_sensor_definitions(definitions, indices):
+    sensorset = {}
+    for i in indices:
+        group, definition = definitions[i]
+        sensorset.setdefault(group, []).append(definition)
+    return sensorset
+
+
+# function that creates the sensors of a sensorset definition (cameras, lidars and radars like in the yaml files)
+def create_sensorset(yaml_sensors):
     sensor_definition = edict(yaml_sensors)
 
     sensor_list = []
@@ -79,3 +108,74 @@ def load_sensorset(yaml_file):
             sensor_list.append(obj_radar)
 
     return sensor_list
+
+
+# function that assigns every sensor the index of its mirror image about y = 0 in the sensor list. sensors without a
+# mirror image get None, sensors that are symmetric themselves get their own index
+def find_mirror_pairs(sensors, tolerance=1e-3):
+    mirror_pairs = [None] * len(sensors)
+    for i, sensor in enumerate(sensors):
+        if mirror_pairs[i] is not None:
+            continue
+        for j in range(i, len(sensors)):
+            if mirror_pairs[j] is None and sensor.is_mirror_of(sensors[j], tolerance):
+                mirror_pairs[i] = j
+                mirror_pairs[j] = i
+                break
+
+    return mirror_pairs
+
+
+# function that sets the metrics of all sensors at once from their calculated coverage
+def set_metrics(sensors, grid):
+    metrics, covered_volume, occluded_volume = grid.compute_sensor_metrics(sensors)
+    for i, sensor in enumerate(sensors):
+        sensor.set_metric_values(metrics[i], covered_volume[i], occluded_volume[i])
+
+
+# function that calculates the coverage of every sensor. in symmetry mode, only one sensor of each mirrored pair and only
+# one half of the grid for symmetric sensors are calculated, the rest is mirrored. if the grid or the vehicle are not
+# symmetric, every sensor is calculated. the metrics of all sensors are only computed at the end in one batch. the
+# sensors and the grid are compared with tolerance, the vehicle with vehicle_tolerance (see Grid.get_mirror_indices)
+def calculate_coverage(sensors, grid, occlusion_mesh, symmetry=False, tolerance=1e-3, vehicle_tolerance=None):
+    mirror_indices = None
+    mirror_pairs = [None] * len(sensors)
+    if symmetry:
+        mirror_indices = grid.get_mirror_indices(tolerance, vehicle_tolerance)
+        if mirror_indices is None:
+            logging.info("Grid or vehicle not symmetric -> calculating every sensor")
+        else:
+            mirror_pairs = find_mirror_pairs(sensors, tolerance)
+
+    max_ix = len(sensors)
+    for ix, sensor in enumerate(sensors):
+        j = mirror_pairs[ix]
+        if j is None:
+            logging.info(f"Calculating Single Sensor {ix + 1} of {max_ix}")
+            sensor.calculate_points(grid.calc_points, occlusion_mesh)
+            sensor.set_covered_points(grid)
+        elif j == ix:
+            logging.info(f"Calculating Single Sensor {ix + 1} of {max_ix} on half of the grid")
+            # every point of the half is mapped on itself or on a point with a higher index
+            half = np.nonzero(mirror_indices >= np.arange(mirror_indices.size))[0]
+            sensor.calculate_points(grid.calc_points[half], occlusion_mesh)
+            calculation_result = np.zeros(mirror_indices.size, dtype=bool)
+            calculation_result[half] = sensor.calculation_result
+            calculation_result[mirror_indices[half]] = sensor.calculation_result
+            occluded_indices = half[sensor.occluded_indices]
+            occluded_indices = np.union1d(occluded_indices, mirror_indices[occluded_indices])
+            sensor.set_coverage(grid, calculation_result, occluded_indices)
+        elif j > ix:
+            logging.info(f"Calculating Single Sensor {ix + 1} of {max_ix}")
+            sensor.calculate_points(grid.calc_points, occlusion_mesh)
+            sensor.set_covered_points(grid)
+        else:
+            logging.info(f"Mirroring Single Sensor {j + 1} to {ix + 1} of {max_ix}")
+            source = sensors[j]
+            sensor.set_coverage(
+                grid,
+                source.calculation_result[mirror_indices],
+                mirror_indices[source.occluded_indices],
+            )
+
+    set_metrics(sensors, grid)
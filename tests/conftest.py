@@ -0,0 +1,38 @@
+from pathlib import Path
+
+import pytest
+import pyvista as pv
+
+from environment.grid import Grid
+from sensors.sensor_helpers import calculate_coverage, load_sensorset
+
+# the tests run on the edgar sensorset and vehicle with a coarse grid, so the whole suite runs in less than a minute
+ROOT = Path(__file__).resolve().parents[1]
+SENSOR_SETUP = ROOT / "sensorsets" / "edgar.yaml"
+GRID = dict(dim_x=20, dim_y=12, dim_z=6, spacing=0.5, center=[0, 0, 0], dist=2)
+
+
+# function that creates the grid of the tests without sensor data
+def create_grid(vehicle, advanced=True):
+    return Grid(**GRID, advanced=advanced, car=vehicle)
+
+
+@pytest.fixture(scope="session")
+def vehicle():
+    return pv.read(str(ROOT / "vehicle" / "t7_reduced.obj")).triangulate()
+
+
+@pytest.fixture(scope="session")
+def sensors():
+    return load_sensorset(SENSOR_SETUP)
+
+
+# grid with the calculated coverage of the sensors and the combined data
+@pytest.fixture(scope="session")
+def grid(vehicle, sensors):
+    grid = create_grid(vehicle)
+    calculate_coverage(sensors, grid, vehicle)
+    grid.combine_data(sensors)
+    grid.set_metrics_no_condition()
+    grid.set_metrics_condition(n1=3, n2=3, n6=2, n7=2, n8=2)
+    return grid
@@ -0,0 +1,172 @@
+import numpy as np
+
+from environment import grid_helpers as helpers
+
+# this file contains the former per-cell implementations of computations that were replaced by vectorized ones. the
+# tests compare the current results with these references
+
+
+# function that returns the indices of the points in the bounding box (xmin, xmax, ymin, ymax, zmin, zmax)
+def get_box(points, bounds):
+    return helpers.get_bounding_box_indices(points, bounds)[0]
+
+
+# function that returns the indices of the points within the distance (far: beyond) and the angles around the
+# corner of the vehicle
+def get_corner_indices(points, indices, corner, dist, angle_start, angle_end, far=False):
+    vectors = helpers.calculate_cyl_from_cart(points[indices] - corner)
+    if far:
+        distance = vectors[:, 0] >= dist
+    else:
+        distance = vectors[:, 0] <= dist
+    angle = (vectors[:, 1] <= angle_end) & (vectors[:, 1] >= angle_start)
+    return indices[distance & angle]
+
+
+# function that returns the indices of the points of the 16 surrounding areas (see plot_helpers.areas) built from
+# bounding boxes and angular sections around the corners of the vehicle
+def get_area_indices(points, car_bounds, dim_x, dim_y, dim_z, center, dist, alpha=15, beta=10):
+    b = car_bounds
+    x_min, x_max = center[0] - dim_x / 2, center[0] + dim_x / 2
+    y_min, y_max = center[1] - dim_y / 2, center[1] + dim_y / 2
+    z_max = center[2] + dim_z
+    corner_fl = np.array([b[1], b[3], 0])
+    corner_fr = np.array([b[1], b[2], 0])
+    corner_rl = np.array([b[0], b[3], 0])
+    corner_rr = np.array([b[0], b[2], 0])
+
+    front_left = get_box(points, (b[1], x_max, b[3], y_max, 0, z_max))
+    front_right = get_box(points, (b[1], x_max, y_min, b[2], 0, z_max))
+    rear_left = get_box(points, (x_min, b[0], b[3], y_max, 0, z_max))
+    rear_right = get_box(points, (x_min, b[0], y_min, b[2], 0, z_max))
+
+    def corner(indices, position, start, end, far=False):
+        return get_corner_indices(points, indices, position, dist, start, end, far)
+
+    return [
+        corner(front_left, corner_fl, alpha, 90, True),
+        np.hstack(
+            (
+                get_box(points, (b[1] + dist, x_max, b[2], b[3], 0, z_max)),
+                corner(front_right, corner_fr, -alpha, 0, True),
+                corner(front_left, corner_fl, 0, alpha, True),
+            )
+        ),
+        corner(front_right, corner_fr, -90, -alpha, True),
+        corner(front_left, corner_fl, alpha, 90),
+        np.hstack(
+            (
+                get_box(points, (b[1], b[1] + dist, b[2], b[3], 0, z_max)),
+                corner(front_right, corner_fr, -alpha, 0),
+                corner(front_left, corner_fl, 0, alpha),
+            )
+        ),
+        corner(front_right, corner_fr, -90, -alpha),
+        get_box(points, (b[0], b[1], b[3] + dist, y_max, 0, z_max)),
+        get_box(points, (b[0], b[1], b[3], b[3] + dist, 0, z_max)),
+        get_box(points, (b[0], b[1], b[2] - dist, b[2], 0, z_max)),
+        get_box(points, (b[0], b[1], y_min, b[2] - dist, 0, z_max)),
+        corner(rear_left, corner_rl, 90, 180 - beta),
+        np.hstack(
+            (
+                get_box(points, (b[0] - dist, b[0], b[2], b[3], 0, z_max)),
+                corner(rear_right, corner_rr, -180, -180 + beta),
+                corner(rear_left, corner_rl, 180 - beta, 180),
+            )
+        ),
+        corner(rear_right, corner_rr, -180 + beta, -90),
+        corner(rear_left, corner_rl, 90, 180 - beta, True),
+        np.hstack(
+            (
+                get_box(points, (x_min, b[0] - dist, b[2], b[3], 0, z_max)),
+                corner(rear_right, corner_rr, -180, -180 + beta, True),
+                corner(rear_left, corner_rl, 180 - beta, 180, True),
+            )
+        ),
+        corner(rear_right, corner_rr, -180 + beta, -90, True),
+    ]
+
+
+# function that combines the coverage of the sensors with one pass per sensor and a branch per sensor class
+def combine_data(grid, sensors):
+    combined_results = np.zeros((grid.calc_points.shape[0], 9))
+    for sensor in sensors:
+        combined_results[:, 0] = np.logical_or(combined_results[:, 0], sensor.calculation_result)
+        combined_results[:, 1] += sensor.calculation_result
+        column = ["Camera", "Lidar", "Radar"].index(type(sensor).__name__)
+        combined_results[:, 3 + column] = np.logical_or(combined_results[:, 3 + column], sensor.calculation_result)
+        combined_results[:, 6 + column] += sensor.calculation_result
+        combined_results[:, 2] = combined_results[:, 3] + combined_results[:, 4] + combined_results[:, 5]
+
+    expanded_data = np.full((grid.points.shape[0], 9), -1)
+    car_value = int(np.amax(combined_results[:, 1])) + 1
+    expanded_data[grid.car_points_indices, :] = car_value
+    np.put_along_axis(expanded_data, grid.outside_indices, combined_results, axis=0)
+    return expanded_data, car_value
+
+
+# function that computes the metrics of the areas (area_indices, the total area is added) with one pass per area and
+# metric from the cell data. a point fulfills a metric, if its value lies between the conditions of the column
+def compute_metrics(grid, area_indices, conditions):
+    area_indices = list(area_indices) + [np.arange(grid.points.shape[0] - 1)]
+    data = grid.mesh.cell_data["sensorset"]
+    metrics = np.zeros((18, data.shape[1]))
+    for area, indices in enumerate(area_indices):
+        for column, (lower, upper) in conditions.items():
+            values = data[indices, column]
+            covered = np.count_nonzero((values >= lower) & (values <= upper))
+            size = grid.calc_points.shape[0] if area == 17 else indices.size
+            metrics[area, column] = round(covered / size * 100, 1) if size else 0
+    return metrics
+
+
+# function that counts the zeros next to car values in every row of data cell by cell (see Slice)
+def get_distances(data, car_value, cell_length):
+    result = np.zeros((data.shape[0], 2))
+    for i in range(data.shape[0]):
+        count_rear, count_front = 0, 0
+        count_rear_bool, count_front_bool = True, False
+        for value in data[i, :]:
+            if count_rear_bool:
+                if value == 0:
+                    count_rear += 1
+                elif value == 1:
+                    count_rear = 0
+                elif value == car_value:
+                    count_rear_bool, count_front_bool = False, True
+            if count_front_bool:
+                if value == 0:
+                    count_front += 1
+                elif value == 1:
+                    count_front_bool = False
+        result[i] = round(count_rear * cell_length, 2), round(count_front * cell_length, 2)
+    return result
+
+
+# function that computes the blind area and the blind distances of a slice from the vtk slice of the grid. the cells
+# of the examined area are sorted into rows along x and along y by their coordinates
+def get_slice_metrics(grid, dist, normal="z"):
+    mesh = grid.slice_coordinate_axis(dist, normal=normal)
+    data = mesh.cell_data["sensorset"][:, 0]
+    points = mesh.cell_centers().points
+    cell_length = grid.spacing
+    blind_area = round(grid.spacing**2 * np.count_nonzero(data == 0), 2)
+    bounds = np.reshape(grid.car.bounds, (3, 2))
+
+    distances = {}
+    for direction in "xy":
+        if direction == normal:
+            continue
+        area = bounds.copy()
+        area["xyz".index(direction)] *= 4
+        indices = helpers.get_bounding_box_indices(points, area.ravel())[0]
+        # rows along direction, sorted by the coordinate across the rows and then along the rows
+        across = ({"x", "y", "z"} - {normal, direction}).pop()
+        along_axis, across_axis = "xyz".index(direction), "xyz".index(across)
+        order = np.lexsort((points[indices, along_axis], points[indices, across_axis]))
+        indices = indices[order]
+        n_rows = np.unique(points[indices, across_axis]).size
+        rows = data[indices].reshape(n_rows, -1) if indices.size else np.zeros((1, 0), dtype=int)
+        distances[direction] = get_distances(rows, grid.car_value, cell_length)
+
+    return blind_area, distances
@@ -0,0 +1,24 @@
+import numpy as np
+
+
+# the covered intervals of lines through the fov of the sensors match a dense sampling of the lines, except for the
+# samples at the ends of the intervals
+def test_line_intervals_match_dense_sampling(vehicle, sensors):
+    rng = np.random.default_rng(0)
+    steps = np.linspace(-10, 10, 1001)
+    for height in (0.01, 0.8):
+        for direction in (0, 1):
+            origins = np.zeros((5, 3))
+            origins[:, 1 - direction] = rng.uniform(-5, 5, 5)
+            origins[:, 2] = height
+            unit = np.eye(3)[direction]
+            points = (origins[:, None] + steps[None, :, None] * unit).reshape(-1, 3)
+            for sensor in sensors:
+                lines, starts, ends = sensor.get_line_intervals(origins, unit, -10, 10, vehicle)
+                dense = sensor.get_point_coverage(points, vehicle).reshape(5, -1)
+                exact = np.zeros_like(dense)
+                ends_of_intervals = np.zeros_like(dense)
+                for line, start, end in zip(lines, starts, ends):
+                    exact[line] |= (steps > start) & (steps < end)
+                    ends_of_intervals[line] |= (np.abs(steps - start) < 1e-6) | (np.abs(steps - end) < 1e-6)
+                assert not np.any((dense != exact) & np.invert(ends_of_intervals))
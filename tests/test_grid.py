@@ -0,0 +1,144 @@
+import copy
+
+import numpy as np
+import pytest
+
+import reference
+from conftest import GRID, create_grid
+from sensors.sensor_helpers import calculate_coverage
+
+# conditions of the metrics of the grid fixture per column of the cell data (lower, upper), upper None is the car value
+CONDITIONS = {
+    0: (1, 1),
+    3: (1, 1),
+    4: (1, 1),
+    5: (1, 1),
+    1: (3, None),
+    2: (3, None),
+    6: (2, None),
+    7: (2, None),
+    8: (2, None),
+}
+
+
+# function that combines the sensors on a new grid and sets the metrics like the grid fixture
+def combine(vehicle, sensors):
+    grid = create_grid(vehicle)
+    grid.combine_data(sensors)
+    grid.set_metrics_no_condition()
+    grid.set_metrics_condition(n1=3, n2=3, n6=2, n7=2, n8=2)
+    return grid
+
+
+# function that asserts that the incrementally updated grid equals the grid combined from the sensors
+def assert_combined(grid, vehicle, sensors):
+    combined = combine(vehicle, sensors)
+    assert grid.car_value == combined.car_value
+    assert np.array_equal(grid.mesh.cell_data["sensorset"], combined.mesh.cell_data["sensorset"])
+    assert np.array_equal(grid.histograms, combined.histograms)
+    assert np.array_equal(grid.metrics, combined.metrics)
+    assert grid.blind_spot_volume == combined.blind_spot_volume
+    for metrics, expected in zip(grid.compute_sensor_metrics(sensors), combined.compute_sensor_metrics(sensors)):
+        assert np.array_equal(metrics, expected)
+
+
+# a lidar is added to an overlapping lidar (the car value rises), the first lidar is swapped for a camera (other
+# technology) and the second lidar is removed (the car value falls). the coverage is calculated by the grid fixture
+def test_update_sensor_matches_combine_data(grid, vehicle, sensors):
+    lidar, other_lidar, camera = sensors[10], sensors[11], sensors[2]
+    grid = combine(vehicle, [lidar])
+    car_value = grid.car_value
+
+    grid.update_sensor(None, other_lidar)
+    assert_combined(grid, vehicle, [lidar, other_lidar])
+    assert grid.car_value > car_value
+
+    grid.update_sensor(lidar, camera)
+    assert_combined(grid, vehicle, [other_lidar, camera])
+
+    grid.update_sensor(other_lidar, None)
+    assert_combined(grid, vehicle, [camera])
+    assert grid.car_value == car_value
+
+
+# the failure metrics of every sensor equal the metrics of the sensorset combined without this sensor
+def test_failure_metrics_match_recombination(grid, vehicle, sensors):
+    metrics, lost_volume, blind_spot_volume = grid.compute_failure_metrics(sensors)
+    for i in range(len(sensors)):
+        reduced = create_grid(vehicle)
+        reduced.combine_data(sensors[:i] + sensors[i + 1:])
+        reduced.set_metrics_no_condition()
+        assert np.allclose(metrics[i], reduced.metrics[:, 0])
+        assert np.isclose(blind_spot_volume[i], reduced.blind_spot_volume)
+        assert np.isclose(lost_volume[i], blind_spot_volume[i] - grid.blind_spot_volume, atol=0.01)
+
+
+# function that returns the area labels of the points from the area indices of the reference, points in several areas
+# get the lower label
+def get_reference_labels(grid):
+    area_indices = reference.get_area_indices(
+        grid.points, grid.car.bounds, GRID["dim_x"], GRID["dim_y"], GRID["dim_z"], GRID["center"], GRID["dist"]
+    )
+    labels = np.full(grid.points.shape[0], -1)
+    labels[grid.car_area_indices] = 16
+    for area, indices in reversed(list(enumerate(area_indices))):
+        labels[indices] = area
+    return labels, area_indices
+
+
+@pytest.mark.parametrize("advanced", [True, False])
+def test_area_labels_match_reference(vehicle, advanced):
+    grid = create_grid(vehicle, advanced)
+    labels, area_indices = get_reference_labels(grid)
+    assert np.array_equal(grid.area_label, labels)
+    # every point of an area of the reference is only in this area
+    for area, indices in enumerate(area_indices):
+        assert np.all(grid.area_label[indices] == area)
+
+
+def test_combine_data_matches_reference(grid, sensors):
+    data, car_value = reference.combine_data(grid, sensors)
+    assert grid.car_value == car_value
+    assert np.array_equal(grid.mesh.cell_data["sensorset"], data)
+
+
+def test_metrics_match_reference(grid):
+    area_indices = get_reference_labels(grid)[1] + [grid.car_area_indices]
+    conditions = {
+        column: (lower, grid.car_value if upper is None else upper) for column, (lower, upper) in CONDITIONS.items()
+    }
+    assert np.array_equal(grid.metrics, reference.compute_metrics(grid, area_indices, conditions))
+
+
+# without the advanced mode the car area is empty, so its metrics are 0. the coverage is calculated on copies of the
+# sensors, which keep their coverage of the grid fixture
+def test_car_area_is_empty_without_advanced_mode(vehicle, sensors, grid):
+    sensors = copy.deepcopy(sensors)
+    normal = create_grid(vehicle, advanced=False)
+    calculate_coverage(sensors, normal, vehicle)
+    normal.combine_data(sensors)
+    normal.set_metrics_no_condition()
+    normal.set_metrics_condition(n1=3, n2=3, n6=2, n7=2, n8=2)
+    assert not np.any(normal.area_label == 16)
+    assert not np.any(normal.metrics[16])
+    assert np.any(grid.metrics[16])
+
+
+# the overlap matrix is symmetric, its diagonal is the covered volume of every sensor and every entry is the volume
+# covered by both sensors
+def test_overlap_matrix(grid, sensors):
+    overlap = grid.compute_overlap_matrix(sensors)
+    covered_volume = grid.compute_sensor_metrics(sensors)[1]
+    cell_volume = grid.spacing**3
+    assert np.array_equal(overlap, overlap.T)
+    assert np.array_equal(np.diag(overlap), covered_volume)
+    for i, j in [(0, 1), (10, 11), (4, 30)]:
+        shared = np.count_nonzero(sensors[i].calculation_result & sensors[j].calculation_result)
+        assert np.isclose(overlap[i, j], shared * cell_volume)
+
+    # the matrix of the total area is the last matrix of the areas, the areas sum up to the points with an area
+    by_area = grid.compute_overlap_matrix(sensors, by_area=True)
+    assert np.array_equal(by_area[-1], overlap)
+    in_area = grid.calc_area_label >= 0
+    shared = np.count_nonzero(sensors[10].calculation_result & sensors[11].calculation_result & in_area)
+    assert np.isclose(np.sum(by_area[:-1, 10, 11]), shared * cell_volume)
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from conftest import GRID, ROOT, create_grid
+from environment.grid import Grid
+from environment.placement import PlacementOptimizer, load_candidates
+from environment.stencil import StencilCache
+
+EXAMPLE_CANDIDATES = ROOT / "placement" / "example_candidates.yaml"
+GRID_ALIGNED_CANDIDATES = ROOT / "placement" / "grid_aligned_candidates.yaml"
+
+
+# function that returns whether points lie on a border of the fov of a sensor, i.e. the fov test changes when they are
+# moved by eps along an axis. the fov of these points depends on the rounding of the position of the sensor
+def is_on_fov_border(sensor, points, eps=1e-5):
+    inside = sensor.get_fov_mask(points)
+    on_border = np.zeros(points.shape[0], dtype=bool)
+    for offset in np.vstack((np.eye(3), -np.eye(3))) * eps:
+        on_border |= sensor.get_fov_mask(points + offset) != inside
+    return on_border
+
+
+# the fov shifted from the stencils equals the fov test of every grid-aligned candidate except for points on the border
+# of the fov, e.g. the diagonal side faces of a camera with a horizontal fov of 90 degrees
+def test_stencil_fov_matches_direct_fov(vehicle):
+    grid = Grid(**dict(GRID, spacing=0.3), advanced=True, car=vehicle)
+    candidates = load_candidates(GRID_ALIGNED_CANDIDATES, vehicle, grid)
+    stencils = StencilCache(grid, candidates.sensors)
+    assert len(stencils.stencils) > 0
+
+    shifted = 0
+    for sensor in candidates.sensors:
+        fov = stencils.get_fov_mask(sensor)
+        if fov is None:
+            continue
+        shifted += 1
+        differences = np.nonzero(fov != sensor.get_fov_mask(grid.calc_points))[0]
+        assert np.all(is_on_fov_border(sensor, grid.calc_points[differences]))
+    assert shifted == len(candidates.sensors)
+
+
+# the placement spends at most the budget, uses every mount point once and every pick adds coverage
+@pytest.mark.parametrize("budget", [None, 3])
+def test_placement_respects_budget(vehicle, budget):
+    grid = create_grid(vehicle)
+    candidates = load_candidates(EXAMPLE_CANDIDATES, vehicle)
+    optimizer = PlacementOptimizer(grid, candidates)
+    optimizer.optimize(budget)
+
+    assert optimizer.selected
+    assert np.sum(candidates.costs[optimizer.selected]) <= (candidates.budget if budget is None else budget)
+    mounts = candidates.mounts[optimizer.selected]
+    assert np.unique(mounts).size == mounts.size
+    assert np.all(np.array(optimizer.gains) > 0)
+    assert np.all(np.diff(optimizer.coverage) >= 0)
@@ -0,0 +1,65 @@
+import copy
+
+import numpy as np
+import pytest
+from easydict import EasyDict as edict
+
+from environment.grid import get_column_conditions
+from environment.grid_helpers import calculate_percentages as percentages
+from environment.results import Results
+from environment.slice import Slice
+from plotting.plot_helpers import areas, metrics
+
+# conditions of the metrics of the grid fixture
+CONDITIONS = dict(N1=3, N2=3, N6=2, N7=2, N8=2)
+
+
+def test_matrix_matches_grid_metrics(grid):
+    results = Results(grid, CONDITIONS)
+    assert np.array_equal(results.get_matrix(), grid.metrics)
+    assert results.get_area("near_left") == dict(zip(metrics, grid.metrics[areas["near_left"]].tolist()))
+
+
+def test_evaluate_outputs(grid):
+    grid = copy.deepcopy(grid)
+    zone = edict(name="front box", type="boxes", x=[4, 8], y=[-3, 3], z=[0, 2])
+    grid.set_zones([zone])
+    results = Results(grid, CONDITIONS)
+    values = results.evaluate(
+        ["blind_spot_volume", "near_front_center:n_sensors", "front box:total_coverage", "z=0.8:blind_area"]
+    )
+
+    assert values["blind_spot_volume"] == grid.blind_spot_volume
+    assert values["near_front_center:n_sensors"] == grid.metrics[areas["near_front_center"], metrics["n_sensors"]]
+    zone_metrics = grid.query_zone_metrics(n1=3, n2=3, n6=2, n7=2, n8=2)
+    assert values["front box:total_coverage"] == zone_metrics[0, metrics["total_coverage"]]
+    assert values["z=0.8:blind_area"] == Slice(grid, 0.8).blind_area
+
+
+@pytest.mark.parametrize(
+    "output", ["total", "total:unknown", "nowhere:total_coverage", "z=0.8:unknown", "z=0.8:_Slice__mesh"]
+)
+def test_evaluate_unknown_output(grid, output):
+    with pytest.raises(ValueError):
+        Results(grid, CONDITIONS).evaluate([output])
+
+
+# a zone covering the whole grid contains all calc_points. the total area contains all grid points but the last one,
+# including the car points which hold the car_value, but its size is the number of calc_points (see
+# Grid.compute_histograms). so the zone counts plus the fulfilling car points reproduce the total area metrics
+def test_full_grid_zone_matches_total_area(grid):
+    grid = copy.deepcopy(grid)
+    bounds = np.reshape(grid.mesh.bounds, (3, 2))
+    zone = edict(name="grid", type="boxes", x=list(bounds[0]), y=list(bounds[1]), z=list(bounds[2]))
+    grid.set_zones([zone])
+    assert np.all(grid.zone_masks)
+
+    lower, upper = get_column_conditions(grid.histograms.shape[1], grid.car_value, CONDITIONS)
+    data = grid.mesh.cell_data["sensorset"]
+    fulfilled = (data >= lower) & (data <= upper)
+    zone_counts = np.count_nonzero(fulfilled[grid.outside_indices.ravel()], axis=0)
+    car_indices = np.setdiff1d(np.arange(grid.points.shape[0] - 1), grid.outside_indices)
+    car_counts = np.count_nonzero(fulfilled[car_indices], axis=0)
+    size = grid.calc_points.shape[0]
+    assert np.array_equal(grid.query_zone_metrics(n1=3, n2=3, n6=2, n7=2, n8=2)[0], percentages(zone_counts, size))
+    assert np.array_equal(grid.metrics[17], percentages(zone_counts + car_counts, size))
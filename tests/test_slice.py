@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+import reference
+from environment.slice import Slice
+
+
+# the slices are views of the cell data ordered like the cells of the vtk slice, their metrics match the cell by cell
+# computation of the reference. the slices cut the vehicle, run above it and lie on cell borders
+@pytest.mark.parametrize(
+    "dist, normal",
+    [(0.3, "z"), (0.8, "z"), (1.5, "z"), (4.2, "z"), (1.0, "z"), (0.0, "y"), (0.9, "y"), (1.25, "x"), (-2.0, "x")],
+)
+def test_slice_matches_vtk_slice(grid, dist, normal):
+    cross_section = Slice(grid, dist, normal=normal)
+    mesh = grid.slice_coordinate_axis(dist, normal=normal)
+    data = cross_section.data.reshape(-1, cross_section.data.shape[-1])
+    assert np.array_equal(data, mesh.cell_data["sensorset"])
+    assert np.allclose(cross_section.points, mesh.cell_centers().points)
+
+    blind_area, distances = reference.get_slice_metrics(grid, dist, normal)
+    assert cross_section.blind_area == blind_area
+    if normal != "x":
+        assert np.array_equal(cross_section.x_dist, distances["x"])
+    if normal != "y":
+        assert np.array_equal(cross_section.y_dist, distances["y"])
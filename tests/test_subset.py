@@ -0,0 +1,74 @@
+import logging
+
+import numpy as np
+import pytest
+import yaml
+
+from environment.subset import SubsetSelection, load_targets
+from plotting.plot_helpers import areas
+
+# targets of the selection, the last one is not met by the whole sensorset
+TARGETS = [
+    dict(area="near_front_center", n_sensors=2, coverage=50),
+    dict(area="near_left", coverage=60),
+    dict(area="near_rear_center", coverage=60),
+    dict(area="total", n_sensors=2, coverage=40),
+    dict(area="far_left", n_sensors=4, coverage=100),
+]
+
+
+# function that counts the points of every target covered by at least n_sensors sensors of the subset cell by cell
+def count_points(grid, sensors, targets, subset):
+    counts = np.sum([sensors[i].calculation_result for i in subset], axis=0, dtype=int)
+    result = []
+    for target in targets:
+        mask = grid.calc_area_label == areas[target.area]
+        if areas[target.area] == 17:
+            mask = np.ones(grid.calc_points.shape[0], dtype=bool)
+        result.append(np.count_nonzero(mask & (counts >= target.n_sensors)))
+    return np.array(result)
+
+
+@pytest.fixture(scope="module")
+def targets(tmp_path_factory):
+    path = tmp_path_factory.mktemp("targets") / "targets.yaml"
+    with open(path, "w") as file:
+        yaml.safe_dump(dict(targets=TARGETS, costs={"Innovusion Falcon front": 5}), file)
+    return load_targets(path)
+
+
+@pytest.fixture(scope="module")
+def selection(grid, sensors, targets):
+    selection = SubsetSelection(grid, sensors, targets)
+    selection.select()
+    return selection
+
+
+# the subset meets every feasible target and keeps the coverage of the whole sensorset for the infeasible ones
+def test_subset_meets_targets(grid, sensors, selection):
+    every_sensor = range(len(sensors))
+    full_counts = count_points(grid, sensors, selection.targets, every_sensor)
+    assert np.array_equal(selection.infeasible, selection.required > full_counts)
+    assert selection.infeasible.tolist() == [False, False, False, False, True]
+
+    counts = count_points(grid, sensors, selection.targets, selection.selected)
+    assert np.all(counts >= np.minimum(selection.required, full_counts))
+    assert len(selection.selected) < len(sensors)
+    assert sorted(selection.selected + selection.dropped) == list(every_sensor)
+
+
+# the subset is minimal, removing any selected sensor breaks a target
+def test_subset_is_minimal(grid, sensors, selection):
+    full_counts = count_points(grid, sensors, selection.targets, range(len(sensors)))
+    limits = np.minimum(selection.required, full_counts)
+    for i in selection.selected:
+        remaining = [j for j in selection.selected if j != i]
+        assert np.any(count_points(grid, sensors, selection.targets, remaining) < limits)
+
+
+# infeasible targets are logged
+def test_infeasible_target_is_reported(grid, sensors, targets, caplog):
+    with caplog.at_level(logging.WARNING):
+        SubsetSelection(grid, sensors, targets).select()
+    assert len(caplog.records) == 1
+    assert "far_left" in caplog.records[0].getMessage()
@@ -0,0 +1,36 @@
+import numpy as np
+import pyvista as pv
+
+from conftest import GRID, ROOT, SENSOR_SETUP, create_grid
+from environment.grid import Grid
+from sensors.sensor_helpers import calculate_coverage, find_mirror_pairs, load_sensorset
+
+
+# on the symmetric box the mirrored sensors of the sensorset and the sensors on y = 0 are mirrored instead of
+# calculated, which gives the same coverage and metrics as the calculation of every sensor
+def test_symmetric_coverage_matches_full_calculation():
+    vehicle = pv.read(str(ROOT / "vehicle" / "simple_box.obj")).triangulate()
+    grid = create_grid(vehicle)
+    assert grid.get_mirror_indices() is not None
+
+    full = load_sensorset(SENSOR_SETUP)
+    mirrored = load_sensorset(SENSOR_SETUP)
+    mirror_pairs = find_mirror_pairs(mirrored)
+    assert any(j is not None and j != i for i, j in enumerate(mirror_pairs))
+    assert any(j == i for i, j in enumerate(mirror_pairs))
+    calculate_coverage(full, grid, vehicle)
+    calculate_coverage(mirrored, grid, vehicle, symmetry=True)
+
+    for expected, sensor in zip(full, mirrored):
+        assert np.array_equal(sensor.calculation_result, expected.calculation_result)
+        assert np.array_equal(sensor.occluded_indices, np.sort(expected.occluded_indices))
+        assert np.array_equal(sensor.metrics, expected.metrics)
+        assert sensor.covered_volume == expected.covered_volume
+        assert sensor.occluded_volume == expected.occluded_volume
+
+
+# the edgar vehicle deviates from its mirror image by about 0.38 m, so it is only symmetric with a loosened tolerance
+def test_vehicle_tolerance_of_asymmetric_vehicle(vehicle):
+    grid = Grid(**dict(GRID, spacing=0.3), advanced=True, car=vehicle)
+    assert grid.get_mirror_indices() is None
+    assert grid.get_mirror_indices(vehicle_tolerance=0.4) is not None
@@ -0,0 +1,67 @@
+import copy
+
+import numpy as np
+from easydict import EasyDict as edict
+
+from conftest import SENSOR_SETUP
+from environment.tolerance import WORKER_STATE, OnlineStatistics, ToleranceAnalysis, evaluate_sample, init_worker
+from sensors.sensor_helpers import load_sensor_definitions
+
+CONDITIONS = edict(N1=3, N2=3, N6=2, N7=2, N8=2)
+
+
+def test_online_statistics_match_numpy():
+    samples = np.random.default_rng(0).normal(size=(50, 4, 3))
+    statistics = OnlineStatistics((4, 3))
+    for sample in samples:
+        statistics.update(sample)
+    assert statistics.count == 50
+    assert np.allclose(statistics.mean, np.mean(samples, axis=0))
+    assert np.allclose(statistics.std, np.std(samples, axis=0, ddof=1))
+    assert np.array_equal(statistics.minimum, np.amin(samples, axis=0))
+    assert np.array_equal(statistics.maximum, np.amax(samples, axis=0))
+
+
+def test_parallel_analysis_matches_serial(grid, sensors):
+    nominal = np.array(grid.metrics)
+    statistics = []
+    for workers in (1, 2):
+        tolerances = edict(
+            samples=2, seed=0, workers=workers, default=dict(position=0.01, orientation=1.0), sensors={}
+        )
+        analysis = ToleranceAnalysis(grid, sensors, SENSOR_SETUP, tolerances, CONDITIONS)
+        analysis.analyze()
+        statistics.append(analysis.statistics)
+    assert np.array_equal(grid.metrics, nominal)
+    assert np.allclose(statistics[0].mean, statistics[1].mean)
+    assert np.allclose(statistics[0].std, statistics[1].std)
+    assert np.array_equal(statistics[0].minimum, statistics[1].minimum)
+
+
+# without tolerances every sample is the nominal sensorset
+def test_analysis_without_tolerances_is_nominal(grid, sensors):
+    tolerances = edict(samples=3, seed=0, workers=1, default={}, sensors={})
+    analysis = ToleranceAnalysis(grid, sensors, SENSOR_SETUP, tolerances, CONDITIONS)
+    analysis.analyze()
+    assert np.allclose(analysis.statistics.mean, analysis.nominal)
+    assert not np.any(analysis.statistics.std)
+
+
+# a sensor with only an orientation tolerance takes its occlusion from the visibility cache of the worker, which
+# equals ray tracing the rotated sensor. without such sensors the worker keeps no cache
+def test_fixed_position_sample_matches_ray_tracing(grid, sensors):
+    group, definition = load_sensor_definitions(SENSOR_SETUP)[10]
+    definition = copy.deepcopy(definition)
+    definition["orientation"]["pitch"] += 10
+    sample = [None] * len(sensors)
+    sample[10] = (group, definition)
+
+    metrics = []
+    for fixed_positions in ({10}, set()):
+        conditions = {key.lower(): value for key, value in CONDITIONS.items()}
+        init_worker(copy.deepcopy(grid), sensors, fixed_positions, conditions)
+        assert (WORKER_STATE["visibility"] is None) == (not fixed_positions)
+        metrics.append(evaluate_sample(sample))
+        WORKER_STATE.clear()
+    assert np.array_equal(metrics[0], metrics[1])
+    assert not np.array_equal(metrics[0], grid.metrics)
@@ -0,0 +1,33 @@
+import copy
+
+import numpy as np
+
+from environment.visibility import VisibilityCache
+
+
+def test_point_coverage_matches_sensor(grid, vehicle, sensors):
+    cache = VisibilityCache(grid.calc_points, vehicle)
+    for sensor in sensors:
+        expected = sensor.get_point_coverage(grid.calc_points, vehicle)
+        assert np.array_equal(cache.get_point_coverage(sensor), expected)
+
+
+# a rotated sensor at a cached position reuses the visibility and traces only the points that are new in its fov
+def test_point_coverage_of_rotated_sensor(grid, vehicle, sensors):
+    cache = VisibilityCache(grid.calc_points, vehicle)
+    cache.get_point_coverage(sensors[0])
+    sensor = copy.deepcopy(sensors[0])
+    sensor.rotate(yaw=30, pitch=-10)
+    expected = sensor.get_point_coverage(grid.calc_points, vehicle)
+    assert np.array_equal(cache.get_point_coverage(sensor), expected)
+
+
+def test_calculate_coverage_matches_sensor(grid, vehicle, sensors):
+    cache = VisibilityCache(grid.calc_points, vehicle)
+    for sensor in sensors:
+        cached = copy.deepcopy(sensor)
+        cache.calculate_coverage(cached, grid)
+        assert np.array_equal(cached.calculation_result, sensor.calculation_result)
+        assert np.array_equal(cached.covered_indices, sensor.covered_indices)
+        assert np.array_equal(cached.occluded_indices, np.sort(sensor.occluded_indices))
+        assert np.array_equal(cached.metrics, sensor.metrics)
@@ -7,6 +7,15 @@ ctk.set_default_color_theme("dark-blue")
 
 
 class GUI:
+    # private function that returns the value of a condition entry, None if the entry is empty, not an integer or not
+    # positive
+    def __read_condition(self, line):
+        try:
+            value = int(line.get())
+        except ValueError:
+            return None
+        return value if value > 0 else None
+
     def set_grid_data(self):
         self.data["dim_x"] = int(self.dimx_line.get())
         self.data["dim_y"] = int(self.dimy_line.get())
@@ -70,9 +79,29 @@ class GUI:
                 f"{self.data['slice_distance']}m in z-direction",
             )
 
-    def __init__(self):
+    # invalid or empty conditions keep the value of the configuration, which is shown in the message
+    def set_conditions(self):
+        conditions = {}
+        invalid = []
+        for name, line in self.condition_lines.items():
+            conditions[name] = self.__read_condition(line)
+            if conditions[name] is None:
+                invalid.append(name)
+                conditions[name] = self.conditions.get(name, 1)
+        self.data["conditions"] = conditions
+        message = "Your Simulation will evaluate the conditions " + ", ".join(
+            f"{name} = {value}" for name, value in conditions.items()
+        )
+        if invalid:
+            message = f"Invalid input for {', '.join(invalid)} -> configuration used. " + message
+        self.display_conditions.delete(0, ctk.END)
+        self.display_conditions.insert(ctk.END, message)
+
+    # conditions are the conditions of the configuration, that are kept for invalid inputs
+    def __init__(self, conditions=None):
         self.root = ctk.CTk()
         self.data = {}
+        self.conditions = dict(conditions) if conditions is not None else {}
         self.setup_ui()
 
     def setup_ui(self):
@@ -261,6 +290,38 @@ class GUI:
         self.display_slices = ctk.CTkEntry(master=frame_slices, width=500)
         self.display_slices.pack(pady=5)
 
+        # ----- frame for the conditions  ------
+        frame_conditions = ctk.CTkFrame(master=right_column)
+        frame_conditions.pack(pady=15, padx=15, fill="both", expand=True)
+        title_conditions = ctk.CTkLabel(
+            master=frame_conditions,
+            text="Select coverage conditions",
+            font=("Roboto", 18),
+            pady=10,
+        )
+        title_conditions.grid(row=0, column=0, sticky="ew", columnspan=5)
+        line4 = ttk.Separator(master=frame_conditions, orient="horizontal")
+        line4.grid(row=1, column=0, sticky="ew", columnspan=5)
+        entry7 = ctk.CTkLabel(
+            master=frame_conditions,
+            pady=5,
+            text="Please enter the minimum number of sensors (N1), sensor technologies (N2), cameras (N6), LIDAR (N7)"
+            " and radars (N8)\nand click confirm. The conditions can also be changed for loaded variables:",
+        )
+        entry7.grid(row=2, column=0, sticky="ew", columnspan=5)
+        self.condition_lines = {}
+        for column, name in enumerate(["N1", "N2", "N6", "N7", "N8"]):
+            title_condition = ctk.CTkLabel(master=frame_conditions, text=f"{name}:")
+            title_condition.grid(row=3, column=column)
+            self.condition_lines[name] = ctk.CTkEntry(master=frame_conditions, width=100)
+            self.condition_lines[name].grid(row=4, column=column, padx=5)
+        confirm_button3 = ctk.CTkButton(
+            master=frame_conditions, text="Confirm", command=self.set_conditions
+        )
+        confirm_button3.grid(row=5, column=2, pady=5)
+        self.display_conditions = ctk.CTkEntry(master=frame_conditions, width=700)
+        self.display_conditions.grid(row=6, column=0, sticky="ew", columnspan=5, pady=5)
+
         final_text = ctk.CTkLabel(
             master=right_column,
             text="To start the application, recheck your inputs and close this window",